@@ -0,0 +1,68 @@
+# -*- mode: python ; coding: utf-8 -*-
+
+from PyInstaller.utils.hooks import collect_submodules
+
+block_cipher = None
+
+# The supabase client stack loads submodules dynamically; collect each package
+# with one directory walk instead of hand-listing modules.
+hiddenimports = (
+    collect_submodules('supabase')
+    + collect_submodules('postgrest')
+    + collect_submodules('gotrue')
+    + collect_submodules('realtime')
+    + collect_submodules('storage3')
+    + ['playwright.sync_api', 'playwright.async_api', 'flask']
+)
+
+a = Analysis(
+    ['main.py'],
+    pathex=[],
+    binaries=[],
+    datas=[
+        ('scraper_config.json', '.'),
+        ('database_schema.sql', '.'),
+        ('database_schema_updated.sql', '.'),
+    ],
+    hiddenimports=hiddenimports,
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[],
+    win_no_prefer_redirects=False,
+    win_private_assemblies=False,
+    cipher=block_cipher,
+    noarchive=False,
+)
+
+pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
+
+exe = EXE(
+    pyz,
+    a.scripts,
+    [],
+    exclude_binaries=True,
+    name='GoogleMapsScraper',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=False,
+    upx=False,
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+    icon=None,
+)
+
+coll = COLLECT(
+    exe,
+    a.binaries,
+    a.zipfiles,
+    a.datas,
+    strip=False,
+    upx=False,
+    upx_exclude=[],
+    name='GoogleMapsScraper',
+)
@@ -6,14 +6,142 @@ Now uses persistent storage to prevent reinstallation on every PC
 """
 
 import os
+import re
 import sys
+import selectors
 import subprocess
 import logging
+from collections import deque
 from pathlib import Path
-from persistent_browser_manager import get_app_data_dir, setup_persistent_browsers, check_browsers_available
+from persistent_browser_manager import get_app_data_dir, setup_persistent_browsers, check_browsers_available, clear_browser_availability_cache
+from persistent_browser_manager import get_browser_status as _get_persistent_status
 
 logger = logging.getLogger(__name__)
 
+# Keyword sets and patterns used to classify installer output lines
+_EXTRACT_KW = frozenset(("extracting", "installing", "setting up"))
+_COMPLETE_KW = frozenset(("success", "installed", "complete"))
+_PREP_KW = frozenset(("preparing", "checking", "verifying"))
+_SKIP_KW = frozenset(("warning", "error"))
+_SIZE_KW = frozenset(("MB", "KB", "GB"))
+_PCT_RE = re.compile(r'(\d+)\s*%')
+
+# Pre-bound progress message templates
+_TMPL_DL_PCT = "Downloading: {}%".format
+_TMPL_DL_LINE = "Downloading: {}...".format
+_TMPL_INSTALLING = "Installing: {}...".format
+
+
+def _on_download_start(line, state, progress_callback):
+    state["download_started"] = True
+    state["progress"] = 15
+    progress_callback("Starting Chromium download...", state["progress"])
+
+
+def _on_download_progress(line, state, progress_callback):
+    if not any(k in line for k in _SIZE_KW):
+        return
+    # Try to extract percentage or size information
+    m = _PCT_RE.search(line)
+    if m:
+        percent = int(m.group(1))
+        state["progress"] = 15 + (percent * 0.5)  # 15-65% for download
+        progress_callback(_TMPL_DL_PCT(percent), int(state["progress"]))
+    else:
+        state["progress"] = min(state["progress"] + 3, 60)
+        progress_callback(_TMPL_DL_LINE(line[:50]), state["progress"])
+
+
+def _on_extract(line, state, progress_callback):
+    state["progress"] = 70
+    progress_callback("Extracting and installing browser...", state["progress"])
+
+
+def _on_complete(line, state, progress_callback):
+    state["progress"] = 95
+    progress_callback("Installation completed!", state["progress"])
+
+
+def _on_prepare(line, state, progress_callback):
+    if state["progress"] < 10:
+        state["progress"] = 5
+        progress_callback("Preparing installation...", state["progress"])
+
+
+def _on_activity(line, state, progress_callback):
+    # Generic progress increment for active lines
+    if state["download_started"] and state["progress"] < 90:
+        state["progress"] = min(state["progress"] + 1, 90)
+        progress_callback(_TMPL_INSTALLING(line[:40]), state["progress"])
+
+
+# Ordered (predicate, handler) pairs; the first matching rule handles the line
+_PROGRESS_RULES = [
+    (lambda line, line_lower: "Downloading" in line and "chromium" in line_lower, _on_download_start),
+    (lambda line, line_lower: "downloading" in line_lower or "downloaded" in line_lower, _on_download_progress),
+    (lambda line, line_lower: any(k in line_lower for k in _EXTRACT_KW), _on_extract),
+    (lambda line, line_lower: any(k in line_lower for k in _COMPLETE_KW) and "chromium" in line_lower, _on_complete),
+    (lambda line, line_lower: any(k in line_lower for k in _PREP_KW), _on_prepare),
+    (lambda line, line_lower: not any(k in line_lower for k in _SKIP_KW), _on_activity),
+]
+
+
+def _classify(line, state, progress_callback):
+    """Run the first matching progress rule for an installer output line"""
+    line_lower = line.lower()
+    for matches, handle in _PROGRESS_RULES:
+        if matches(line, line_lower):
+            handle(line, state, progress_callback)
+            return
+
+
+def _iter_output_chunks(stream):
+    """Yield raw output blocks from a child process pipe until EOF"""
+    if os.name == "nt":
+        # selectors can't wait on pipes on Windows - use plain block reads
+        while True:
+            chunk = stream.read1(65536)
+            if not chunk:
+                return
+            yield chunk
+    
+    fd = stream.fileno()
+    os.set_blocking(fd, False)
+    with selectors.DefaultSelector() as sel:
+        sel.register(fd, selectors.EVENT_READ)
+        while True:
+            if not sel.select(timeout=0.25):
+                continue
+            # Drain everything currently buffered in the pipe
+            while True:
+                try:
+                    chunk = os.read(fd, 65536)
+                except BlockingIOError:
+                    break
+                if not chunk:
+                    return
+                yield chunk
+
+
+def _iter_output_lines(stream):
+    """Split a child process pipe into non-empty lines, decoded as UTF-8.
+    
+    Output is read as bytes and decoded explicitly instead of through the
+    locale codec (cp1252 on Windows), which chokes on Playwright's progress bar glyphs.
+    """
+    pending = b''
+    for chunk in _iter_output_chunks(stream):
+        pending += chunk
+        lines = pending.split(b'\n')
+        pending = lines.pop()
+        for raw_line in lines:
+            raw_line = raw_line.strip()
+            if raw_line:
+                yield raw_line.decode('utf-8', 'replace')
+    pending = pending.strip()
+    if pending:
+        yield pending.decode('utf-8', 'replace')
+
 
 def check_browsers_installed() -> bool:
     """Check if Playwright browsers are installed and working"""
@@ -28,85 +156,40 @@ def check_browsers_installed() -> bool:
 
 def install_browsers(progress_callback=None) -> bool:
     """Install Playwright browsers using official command with progress tracking"""
+    # persistent_browser_manager's availability memo is the only browser status
+    # cache; drop it before and after the install so no poll made meanwhile
+    # outlives it
+    clear_browser_availability_cache()
     try:
         # Get persistent storage directory
         persistent_dir = get_app_data_dir()
+        os.environ["PLAYWRIGHT_BROWSERS_PATH"] = str(persistent_dir)
         logger.info(f"Installing Playwright browsers to persistent location: {persistent_dir}")
         logger.info("This will download ~127MB for Chromium browser")
         
-        # Set environment variable to install to persistent location
-        os.environ["PLAYWRIGHT_BROWSERS_PATH"] = str(persistent_dir)
-        
         if progress_callback:
             progress_callback("Starting browser installation...", 0)
         
-        # Use the official Playwright install command with real-time output
+        # Use the official Playwright install command with real-time output.
+        # The pipe is drained in binary blocks and split into lines ourselves -
+        # much cheaper than line-buffered text readline() on chatty output.
         process = subprocess.Popen([
             sys.executable, "-m", "playwright", "install", "chromium"
-        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, 
-           text=True, universal_newlines=True, bufsize=1)
+        ], stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=os.environ)
         
-        output_lines = []
-        download_started = False
-        current_progress = 0
+        output_lines = deque(maxlen=10)  # Tail kept for error reporting
+        state = {"progress": 0, "download_started": False}
         
-        while True:
-            output = process.stdout.readline()
-            if output == '' and process.poll() is not None:
-                break
-            if output:
-                output_lines.append(output.strip())
-                line = output.strip()
-                logger.info(f"Playwright: {line}")
-                
-                # Enhanced progress tracking based on output patterns
-                if progress_callback:
-                    # Initial setup phase
-                    if "Downloading" in line and "chromium" in line.lower():
-                        download_started = True
-                        current_progress = 15
-                        progress_callback("Starting Chromium download...", current_progress)
-                    
-                    # Download progress tracking
-                    elif "downloading" in line.lower() or "downloaded" in line.lower():
-                        if any(size in line for size in ["MB", "KB", "GB"]):
-                            # Try to extract percentage or size information
-                            if "%" in line:
-                                try:
-                                    percent = int(line.split("%")[0].split()[-1])
-                                    current_progress = 15 + (percent * 0.5)  # 15-65% for download
-                                    progress_callback(f"Downloading: {percent}%", int(current_progress))
-                                except:
-                                    current_progress = min(current_progress + 5, 60)
-                                    progress_callback(f"Downloading: {line[:50]}...", current_progress)
-                            else:
-                                current_progress = min(current_progress + 3, 60)
-                                progress_callback(f"Downloading: {line[:50]}...", current_progress)
-                    
-                    # Extraction/Installation phase
-                    elif any(word in line.lower() for word in ["extracting", "installing", "setting up"]):
-                        current_progress = 70
-                        progress_callback("Extracting and installing browser...", current_progress)
-                    
-                    # Completion indicators
-                    elif any(word in line.lower() for word in ["success", "installed", "complete"]) and "chromium" in line.lower():
-                        current_progress = 95
-                        progress_callback("Installation completed!", current_progress)
-                    
-                    # Progress during various phases
-                    elif any(word in line.lower() for word in ["preparing", "checking", "verifying"]):
-                        if current_progress < 10:
-                            current_progress = 5
-                            progress_callback("Preparing installation...", current_progress)
-                    
-                    # Generic progress increment for active lines
-                    elif line and not any(skip in line.lower() for skip in ["warning", "error"]) and download_started:
-                        if current_progress < 90:
-                            current_progress = min(current_progress + 1, 90)
-                            progress_callback(f"Installing: {line[:40]}...", current_progress)
+        for line in _iter_output_lines(process.stdout):
+            output_lines.append(line)
+            logger.info(f"Playwright: {line}")
+            
+            # Progress tracking is only worth doing when someone is listening
+            if progress_callback:
+                _classify(line, state, progress_callback)
         
         # Wait for process to complete
-        return_code = process.poll()
+        return_code = process.wait()
         
         if return_code == 0:
             logger.info("✅ Browsers installed successfully!")
@@ -114,7 +197,7 @@ def install_browsers(progress_callback=None) -> bool:
                 progress_callback("Browsers installed successfully!", 100)
             return True
         else:
-            error_output = '\n'.join(output_lines[-10:])  # Last 10 lines
+            error_output = '\n'.join(output_lines)
             logger.error(f"Browser installation failed: {error_output}")
             if progress_callback:
                 progress_callback("Installation failed", -1)
@@ -125,15 +208,14 @@ def install_browsers(progress_callback=None) -> bool:
         if progress_callback:
             progress_callback(f"Installation error: {str(e)}", -1)
         return False
+    finally:
+        clear_browser_availability_cache()
 
 
 def get_browser_status() -> dict:
     """Get simple browser status"""
-    # Import here to avoid circular imports
-    from persistent_browser_manager import get_browser_status as get_persistent_status
-    
     # Get detailed status from persistent manager
-    detailed_status = get_persistent_status()
+    detailed_status = _get_persistent_status()
     
     # Return simplified status for backwards compatibility
     return {
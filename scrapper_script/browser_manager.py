@@ -8,13 +8,9 @@ import random
 import logging
 from typing import List
 from playwright.async_api import async_playwright, Browser, BrowserContext, Page
-from persistent_browser_manager import setup_persistent_browsers
 
 logger = logging.getLogger(__name__)
 
-# Ensure persistent browsers are setup before using Playwright
-setup_persistent_browsers()
-
 class EnhancedBrowserPool:
     """Optimized browser pool"""
     
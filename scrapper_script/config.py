@@ -3,8 +3,14 @@
 Configuration and selectors for Google Maps Scraper
 """
 
+import os
 import re
-from typing import Dict, Any
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+from dotenv import load_dotenv
+
+# Load environment variables (the single .env read for the server and webhooks)
+load_dotenv()
 
 class OptimizedSelectorsConfig:
     """Refined selectors based on JavaScript testing insights"""
@@ -47,4 +53,33 @@ class OptimizedSelectorsConfig:
         }
 
 # Default configuration instance
-DEFAULT_CONFIG = OptimizedSelectorsConfig() 
\ No newline at end of file
+DEFAULT_CONFIG = OptimizedSelectorsConfig() 
+
+@dataclass(frozen=True)
+class ServerConfig:
+    """Server and webhook settings, read from the environment once at startup"""
+    default_max_results: int = 50
+    cache_ttl_minutes: int = 0
+    server_host: Optional[str] = None
+    server_port: Optional[int] = None
+    max_concurrent_jobs: int = 4
+    n8n_webhook_c: Optional[str] = None
+    n8n_webhook_t: Optional[str] = None
+    webhook_batching: bool = False
+    force_conn_close: bool = False
+    
+    @classmethod
+    def from_env(cls) -> 'ServerConfig':
+        """Build a config from the current environment (the GUI sets it before starting the server)"""
+        port = os.getenv('SERVER_PORT')
+        return cls(
+            default_max_results=int(os.getenv('DEFAULT_MAX_RESULTS', 50)),
+            cache_ttl_minutes=int(os.getenv('CACHE_TTL_MINUTES', 0)),
+            server_host=os.getenv('SERVER_HOST'),
+            server_port=int(port) if port else None,
+            max_concurrent_jobs=int(os.getenv('MAX_CONCURRENT_JOBS', 4)),
+            n8n_webhook_c=os.getenv('N8N_WEBHOOK_C'),
+            n8n_webhook_t=os.getenv('N8N_WEBHOOK_T'),
+            webhook_batching=os.getenv('N8N_WEBHOOK_BATCHING', '').lower() in ('1', 'true', 'yes'),
+            force_conn_close=bool(os.getenv('FORCE_CONN_CLOSE')),
+        )
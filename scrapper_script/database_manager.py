@@ -5,90 +5,188 @@ Database manager for Supabase integration with n8n workflow
 
 import os
 import logging
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, Any, List, Optional
+import httpx
 from supabase import create_client, Client
 
+try:
+    import psycopg
+    from psycopg.types.json import Jsonb
+except ImportError:  # Optional: only needed for direct COPY ingest via DATABASE_URL
+    psycopg = None
+
 logger = logging.getLogger(__name__)
 
+# Column order for COPY-based business ingest
+COPY_COLUMNS = (
+    'area_id', 'scrape_job_id', 'name', 'address', 'phone', 'website', 'category',
+    'rating', 'review_count', 'latitude', 'longitude', 'raw_info', 'status',
+    'contact_status', 'created_at', 'updated_at'
+)
+
+# Business fields stored in their own columns; raw_info keeps only the rest
+EXTRACTED_KEYS = frozenset((
+    'name', 'address', 'phone', 'website', 'category',
+    'rating', 'review_count', 'latitude', 'longitude'
+))
+
+# PostgREST / Postgres error codes for a function or view that does not exist,
+# i.e. the database_schema_updated.sql objects have not been installed
+MISSING_OBJECT_CODES = frozenset(('PGRST202', 'PGRST205', '42883', '42P01'))
+
+def _is_missing_db_object(error: Exception) -> bool:
+    """True if a PostgREST error means the RPC function or view is not installed"""
+    code = getattr(error, 'code', None)
+    return code in MISSING_OBJECT_CODES or any(missing in str(error) for missing in MISSING_OBJECT_CODES)
+
 class DatabaseManager:
     """Handles all database operations for the scraper"""
     
+    # Rows per businesses INSERT; large enough to amortize round-trips while
+    # staying well under PostgREST request size limits
+    INSERT_BATCH_SIZE = 500
+    
+    # Above this many rows, store_businesses uses COPY over a direct Postgres
+    # connection when DATABASE_URL is configured
+    COPY_THRESHOLD = 100
+    
+    # Above this many rows, store_businesses uses the bulk_insert_businesses RPC
+    BULK_RPC_THRESHOLD = 200
+    
+    # Concurrent INSERT requests when a job produces several batches
+    INSERT_WORKERS = 8
+    
+    FINAL_JOB_STATUSES = ('completed', 'failed')
+    
     def __init__(self):
         """Initialize Supabase client"""
         self.supabase_url = os.getenv('SUPABASE_URL')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY')
-        self.admin_id = os.getenv('ADMIN_ID', '1')  # Default admin ID (now supports UUID)
         
         if not self.supabase_url or not self.supabase_key:
             raise ValueError("SUPABASE_URL and SUPABASE_ANON_KEY must be set in environment variables")
         
+        # admins.id is a UUID: parse it once here so a bad value fails at startup
+        # instead of being rejected by PostgREST on every call
+        try:
+            self.admin_id = uuid.UUID(os.getenv('ADMIN_ID', ''))
+        except ValueError:
+            raise ValueError(f"ADMIN_ID must be a valid UUID, got {os.getenv('ADMIN_ID')!r}")
+        self._admin_key = str(self.admin_id)
+        
         try:
             self.client: Client = create_client(self.supabase_url, self.supabase_key)
+            self._use_pooled_http_client()
             logger.info(f"Database manager initialized for admin ID: {self.admin_id}")
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             raise
+        
+        # Optional direct Postgres access for bulk COPY ingest. Each COPY opens
+        # its own connection: jobs store results concurrently from worker
+        # threads, and a shared connection would interleave their transactions
+        self.database_url = None
+        database_url = os.getenv('DATABASE_URL')
+        if database_url:
+            if psycopg is None:
+                logger.warning("DATABASE_URL is set but psycopg is not installed - using PostgREST for inserts")
+            else:
+                self.database_url = database_url
+                logger.info("Direct Postgres connection enabled for bulk inserts")
+        
+        # Cleared the first time the bulk_insert_businesses RPC turns out not to exist
+        self.bulk_rpc_available = True
     
-    def mark_admin_busy(self, job_id: int) -> bool:
-        """Mark admin as busy and update job assignment"""
+    def _use_pooled_http_client(self):
+        """Swap the PostgREST session for a keep-alive HTTP/2 client so the many
+        small UPDATEs reuse one TLS connection instead of reconnecting"""
+        postgrest = self.client.postgrest
+        session = postgrest.session
+        # Rebuild with the same options postgrest-py creates its session with;
+        # verify and proxy live in the transport, so read them off the client
+        options = {}
+        proxy = getattr(postgrest, 'proxy', None)
+        if proxy:
+            options['proxy'] = proxy
         try:
-            # First check current job status to avoid invalid transitions
-            job_check = self.client.table('scrape_jobs').select('status').eq('id', job_id).execute()
-            
-            if job_check.data and len(job_check.data) > 0:
-                current_status = job_check.data[0]['status']
-                logger.debug(f"Job {job_id} current status: {current_status}")
-                
-                # Only update if not already in a final state
-                if current_status in ['completed', 'failed']:
-                    logger.warning(f"Job {job_id} already in final state: {current_status}")
-                    return False
-                    
-                # Only update if not already running
-                if current_status == 'running':
-                    logger.info(f"Job {job_id} already running, skipping status update")
-                    # Still mark admin as busy
-                    admin_response = self.client.table('admins').update({
-                        'status': 'busy'
-                    }).eq('id', self.admin_id).execute()
-                    return admin_response.data is not None
+            pooled = httpx.Client(
+                base_url=session.base_url,
+                headers=session.headers,
+                auth=session.auth,
+                timeout=session.timeout,
+                verify=getattr(postgrest, 'verify', True),
+                follow_redirects=session.follow_redirects,
+                trust_env=session.trust_env,
+                http2=True,
+                limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=300),
+                **options
+            )
+        except ImportError as e:
+            # http2=True needs the h2 package (httpx[http2])
+            logger.warning(f"HTTP/2 unavailable, keeping default PostgREST session: {e}")
+            return
+        self.client.postgrest.session = pooled
+        session.close()
+    
+    def mark_admin_busy(self, job_id: int) -> str:
+        """Claim a pending job for this admin and mark the admin busy.
+        
+        Returns 'claimed', 'not_pending' (the job is missing, already claimed by
+        another worker or finished - the caller must not process it),
+        'admin_not_found' or 'error'.
+        """
+        try:
+            # claim_job (see database_schema_updated.sql) moves the job to running
+            # only if it is still pending and then marks the admin busy, atomically
+            # and in a single round-trip, so only one worker wins the job
+            response = self.client.rpc('claim_job', {
+                'p_job_id': job_id,
+                'p_admin': self._admin_key
+            }).execute()
+            result = response.data or 'error'
+        except Exception as e:
+            if not _is_missing_db_object(e):
+                logger.error(f"Error marking admin as busy: {e}")
+                return 'error'
+            result = self._claim_job_without_rpc(job_id)
+        
+        if result == 'claimed':
+            logger.info(f"Admin {self.admin_id} marked as busy, job {job_id} marked as running")
+        elif result == 'not_pending':
+            logger.warning(f"Job {job_id} is not pending - not found, already claimed by another worker or finished")
+        else:
+            logger.warning(f"Failed to mark admin {self.admin_id} as busy for job {job_id}: {result}")
+        return result
+    
+    def _claim_job_without_rpc(self, job_id: int) -> str:
+        """Two-request version of claim_job for databases without the function"""
+        try:
+            # The status filter still lets only one worker move the job to running
+            job_response = self.client.table('scrape_jobs').update({
+                'status': 'running',
+                'assigned_to_uuid': self._admin_key,
+                'started_at': datetime.now().isoformat()
+            }).eq('id', job_id).eq('status', 'pending').execute()
+            if not job_response.data:
+                return 'not_pending'
             
-            # Update admin status to busy
             admin_response = self.client.table('admins').update({
                 'status': 'busy'
-            }).eq('id', self.admin_id).execute()
-            
-            if admin_response.data:
-                logger.info(f"Admin {self.admin_id} marked as busy for job {job_id}")
-                
-                # Update job status to running only if it's pending
-                job_response = self.client.table('scrape_jobs').update({
-                    'status': 'running',
-                    'assigned_to_uuid': self.admin_id,
-                    'started_at': datetime.now().isoformat()
-                }).eq('id', job_id).eq('status', 'pending').execute()
-                
-                if job_response.data:
-                    logger.info(f"Job {job_id} marked as running")
-                    return True
-                else:
-                    logger.warning(f"Job {job_id} may already be running or completed")
-                    return True  # Admin is still marked busy, which is what matters
-            else:
-                logger.warning(f"Failed to mark admin {self.admin_id} as busy")
-                return False
-                
+            }).eq('id', self._admin_key).execute()
+            return 'claimed' if admin_response.data else 'admin_not_found'
         except Exception as e:
             logger.error(f"Error marking admin as busy: {e}")
-            return False
+            return 'error'
     
     def mark_admin_active(self) -> bool:
         """Mark admin as active (available for new jobs)"""
         try:
             response = self.client.table('admins').update({
                 'status': 'active'
-            }).eq('id', self.admin_id).execute()
+            }).eq('id', self._admin_key).execute()
             
             if response.data:
                 logger.info(f"Admin {self.admin_id} marked as active")
@@ -106,7 +204,7 @@ class DatabaseManager:
         try:
             response = self.client.table('admins').update({
                 'status': 'inactive'
-            }).eq('id', self.admin_id).execute()
+            }).eq('id', self._admin_key).execute()
 
             if response.data:
                 logger.info(f"Admin {self.admin_id} marked as inactive")
@@ -120,56 +218,79 @@ class DatabaseManager:
             return False
     
     def update_job_status(self, job_id: int, status: str, businesses_found: int = 0, 
-                         processing_time_seconds: float = 0, completed_at: str = None,
+                         processing_time_seconds: float = 0,
                          error_message: str = None, logs: str = None) -> bool:
-        """Update job status and completion details"""
+        """Update job status and completion details.
+        
+        Final statuses send completed_at and always both counters, so a retried
+        job does not keep its previous values; other statuses send only the
+        non-empty fields. Where the scrape_jobs_stamp_completion trigger is
+        installed it restamps completed_at and the logs timestamp with the
+        database clock.
+        
+        Returns True if the job was updated or was already in that or a final
+        state, False if it does not exist or the update failed.
+        """
+        final = status in self.FINAL_JOB_STATUSES
         try:
-            # First check current status to avoid invalid transitions
-            job_check = self.client.table('scrape_jobs').select('status').eq('id', job_id).execute()
-            
-            if job_check.data and len(job_check.data) > 0:
-                current_status = job_check.data[0]['status']
-                logger.debug(f"Job {job_id} current status: {current_status}, updating to: {status}")
-                
-                # Avoid updating if already in the target status
-                if current_status == status:
-                    logger.info(f"Job {job_id} already in status: {status}, skipping update")
-                    return True
-                    
-                # Prevent invalid transitions to final states
-                if current_status in ['completed', 'failed'] and status in ['completed', 'failed']:
-                    logger.warning(f"Job {job_id} already in final state: {current_status}, cannot update to: {status}")
-                    return True  # Don't treat this as an error since the job is already done
-            
+            now_iso = datetime.now().isoformat()
             update_data = {
                 'status': status,
-                'businesses_found': businesses_found,
-                'processing_time_seconds': int(processing_time_seconds)
-            }
-            
-            if completed_at:
-                update_data['completed_at'] = completed_at
-            
-            if error_message:
-                update_data['error_message'] = error_message
-            
-            if logs:
+                **({'completed_at': now_iso} if final else {}),
+                **({'businesses_found': businesses_found} if final or businesses_found else {}),
+                **({'processing_time_seconds': int(processing_time_seconds)} if final or processing_time_seconds else {}),
+                **({'error_message': error_message} if error_message else {}),
                 # Store logs as JSON
-                update_data['logs'] = {'extraction_method': logs, 'timestamp': datetime.now().isoformat()}
+                **({'logs': {'extraction_method': logs, 'timestamp': now_iso}} if logs else {})
+            }
             
-            response = self.client.table('scrape_jobs').update(update_data).eq('id', job_id).execute()
+            # Guard the transition inside the UPDATE instead of a separate SELECT:
+            # a job already in a final state (or already in the target status)
+            # simply matches zero rows
+            query = self.client.table('scrape_jobs').update(update_data).eq('id', job_id)
+            if final:
+                query = query.not_.in_('status', list(self.FINAL_JOB_STATUSES))
+            else:
+                query = query.neq('status', status)
+            response = query.execute()
             
             if response.data:
                 logger.info(f"Job {job_id} status updated to {status}")
                 return True
-            else:
-                logger.warning(f"Failed to update job {job_id} status")
-                return False
+            
+            # Zero rows matched: tell an already-settled job from a missing one.
+            # This extra SELECT only runs on the uncommon no-op path.
+            existing = self.client.table('scrape_jobs').select('status').eq('id', job_id).execute()
+            if existing.data:
+                # Don't treat this as an error - the job is already done or in this status
+                logger.info(f"Job {job_id} already in status {existing.data[0]['status']}, not updated to {status}")
+                return True
+            
+            logger.warning(f"Failed to update job {job_id} status: job not found")
+            return False
                 
         except Exception as e:
             logger.error(f"Error updating job status: {e}")
             return False
     
+    def complete_job(self, job_id: int, area_id: int, businesses_found: int = 0,
+                     processing_time_seconds: float = 0, logs: str = None) -> bool:
+        """Mark a job completed and update its area's last_scraped_at.
+        
+        The two updates are independent, so they are sent concurrently.
+        """
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            status_future = executor.submit(
+                self.update_job_status,
+                job_id=job_id,
+                status='completed',
+                businesses_found=businesses_found,
+                processing_time_seconds=processing_time_seconds,
+                logs=logs
+            )
+            area_future = executor.submit(self.update_area_last_scraped, [area_id])
+            return status_future.result() and area_future.result()
+    
     def store_businesses(self, job_id: int, area_id: int, businesses: List[Dict[str, Any]]) -> bool:
         """Store scraped businesses in the database"""
         try:
@@ -177,34 +298,48 @@ class DatabaseManager:
                 logger.warning(f"No businesses to store for job {job_id}")
                 return True
             
-            # Prepare business records for insertion
+            # Prepare business records for insertion. Bind the helpers once -
+            # this loop runs for every scraped business.
+            clean_text = self._clean_text
+            validate_rating = self._validate_rating
+            validate_review_count = self._validate_review_count
+            validate_lat = self._validate_lat
+            validate_lon = self._validate_lon
+            now_iso = datetime.now().isoformat()
+            
             business_records = []
             for i, business in enumerate(businesses):
                 try:
+                    get = business.get
+                    name = clean_text(get('name'), 255)
+                    is_unknown = name is None
+                    
                     # Clean and validate business data
                     record = {
                         'area_id': area_id,
                         'scrape_job_id': job_id,
-                        'name': business.get('name', '').strip()[:255] if business.get('name') else f'Unknown Business {i+1}',
-                        'address': business.get('address', '').strip()[:500] if business.get('address') else None,
-                        'phone': business.get('phone', '').strip()[:50] if business.get('phone') else None,
-                        'website': business.get('website', '').strip()[:500] if business.get('website') else None,
-                        'category': business.get('category', '').strip()[:100] if business.get('category') else None,
-                        'rating': self._validate_rating(business.get('rating')),
-                        'review_count': self._validate_review_count(business.get('review_count')),
-                        'latitude': self._validate_coordinate(business.get('latitude')),
-                        'longitude': self._validate_coordinate(business.get('longitude')),
-                        'raw_info': business,  # Store complete raw data as JSONB
+                        'name': f'Unknown Business {i+1}' if is_unknown else name,
+                        'address': clean_text(get('address'), 500),
+                        'phone': clean_text(get('phone'), 50),
+                        'website': clean_text(get('website'), 500),
+                        'category': clean_text(get('category'), 100),
+                        'rating': validate_rating(get('rating')),
+                        'review_count': validate_review_count(get('review_count')),
+                        'latitude': validate_lat(get('latitude')),
+                        'longitude': validate_lon(get('longitude')),
+                        # Remaining raw data as JSONB (extracted columns aren't duplicated)
+                        'raw_info': {k: v for k, v in business.items() if k not in EXTRACTED_KEYS},
                         'status': 'new',
                         'contact_status': 'not_contacted',
-                        'created_at': datetime.now().isoformat(),
-                        'updated_at': datetime.now().isoformat()
+                        'created_at': now_iso,
+                        'updated_at': now_iso
                     }
                     
                     # Only add if we have a valid name
-                    if record['name'] and not record['name'].startswith('Unknown Business'):
-                        business_records.append(record)
-                    elif record['name'].startswith('Unknown Business') and len(business_records) == 0:
+                    if not is_unknown:
+                        if name:
+                            business_records.append(record)
+                    elif not business_records:
                         # Include at least one record even if name is unknown
                         business_records.append(record)
                         
@@ -216,32 +351,51 @@ class DatabaseManager:
                 logger.warning(f"No valid businesses to store for job {job_id}")
                 return True
             
-            # Insert businesses in smaller batches to avoid timeout and improve reliability
-            batch_size = 10
+            # With a direct connection, COPY is the fastest bulk ingest path
+            if self.database_url is not None and len(business_records) > self.COPY_THRESHOLD:
+                total_inserted = self._copy_businesses(business_records, job_id)
+                if total_inserted is not None:
+                    logger.info(f"Successfully stored {total_inserted}/{len(business_records)} businesses for job {job_id} via COPY")
+                    return total_inserted >= (len(business_records) * 0.5)
+            
+            # Large jobs go through one server-side set insert instead of many
+            # PostgREST batches; fall back to batches if the RPC isn't available
+            if self.bulk_rpc_available and len(business_records) > self.BULK_RPC_THRESHOLD:
+                total_inserted = self._bulk_insert_businesses(business_records, job_id)
+                if total_inserted is not None:
+                    logger.info(f"Successfully stored {total_inserted}/{len(business_records)} businesses for job {job_id} via bulk insert")
+                    return total_inserted >= (len(business_records) * 0.5)
+            
+            # Insert businesses in large batches to keep round-trips low;
+            # oversized batches are split on demand by _insert_business_batch
+            batch_size = self.INSERT_BATCH_SIZE
+            batches = [business_records[i:i + batch_size] for i in range(0, len(business_records), batch_size)]
             total_inserted = 0
             failed_batches = 0
             
-            for i in range(0, len(business_records), batch_size):
-                batch = business_records[i:i + batch_size]
-                batch_num = i // batch_size + 1
-                
-                try:
+            # Batches are independent, so overlap their network round-trips.
+            # Results are aggregated on this thread, so the counters need no lock.
+            with ThreadPoolExecutor(max_workers=min(self.INSERT_WORKERS, len(batches))) as executor:
+                futures = {}
+                for batch_num, batch in enumerate(batches, 1):
                     logger.debug(f"Inserting batch {batch_num} with {len(batch)} businesses for job {job_id}")
+                    futures[executor.submit(self._insert_business_batch, batch)] = batch_num
+                
+                for future in as_completed(futures):
+                    batch_num = futures[future]
+                    try:
+                        inserted_count = future.result()
+                    except Exception as batch_error:
+                        logger.error(f"Error inserting batch {batch_num} for job {job_id}: {batch_error}")
+                        failed_batches += 1
+                        continue
                     
-                    response = self.client.table('businesses').insert(batch).execute()
-                    
-                    if response.data:
-                        inserted_count = len(response.data)
+                    if inserted_count:
                         total_inserted += inserted_count
                         logger.info(f"Inserted batch {batch_num} of {inserted_count} businesses for job {job_id}")
                     else:
                         logger.warning(f"Failed to insert batch {batch_num} for job {job_id} - no data returned")
                         failed_batches += 1
-                        
-                except Exception as batch_error:
-                    logger.error(f"Error inserting batch {batch_num} for job {job_id}: {batch_error}")
-                    failed_batches += 1
-                    continue
             
             success_rate = (total_inserted / len(business_records)) * 100 if business_records else 0
             logger.info(f"Successfully stored {total_inserted}/{len(business_records)} businesses for job {job_id} ({success_rate:.1f}% success rate)")
@@ -253,18 +407,92 @@ class DatabaseManager:
             logger.error(f"Error storing businesses for job {job_id}: {e}")
             return False
     
-    def update_area_last_scraped(self, area_id: int) -> bool:
-        """Update the last_scraped_at timestamp for an area"""
+    def _copy_businesses(self, business_records: List[Dict[str, Any]], job_id: int) -> Optional[int]:
+        """Insert all records with COPY over a dedicated direct Postgres connection.
+        
+        The COPY runs in a single transaction that commits when the connection
+        block exits. Returns the number of rows inserted, or None if the COPY failed.
+        """
+        try:
+            with psycopg.connect(self.database_url, connect_timeout=10) as conn:
+                with conn.cursor() as cursor:
+                    with cursor.copy(f"COPY businesses ({', '.join(COPY_COLUMNS)}) FROM STDIN") as copy:
+                        for record in business_records:
+                            copy.write_row(tuple(
+                                Jsonb(record[column]) if column == 'raw_info' else record[column]
+                                for column in COPY_COLUMNS
+                            ))
+            return len(business_records)
+        except Exception as e:
+            logger.warning(f"COPY failed for job {job_id}, falling back to PostgREST: {e}")
+            return None
+    
+    def _bulk_insert_businesses(self, business_records: List[Dict[str, Any]], job_id: int) -> Optional[int]:
+        """Insert all records in one bulk_insert_businesses RPC call.
+        
+        The RPC is all-or-nothing. Returns the number of rows inserted, or None
+        if it failed; the caller then stores the records through
+        _insert_business_batch, which isolates rows the database rejects.
+        """
+        try:
+            response = self.client.rpc('bulk_insert_businesses', {'payload': business_records}).execute()
+            return int(response.data or 0)
+        except Exception as e:
+            if _is_missing_db_object(e):
+                self.bulk_rpc_available = False
+                logger.warning("bulk_insert_businesses is not installed - using batched inserts from now on")
+            elif self._is_row_data_error(e):
+                logger.warning(f"Bulk insert for job {job_id} rejected a row ({e}), retrying in batches to keep the valid rows")
+            else:
+                logger.warning(f"Bulk insert RPC failed for job {job_id}, falling back to batched inserts: {e}")
+            return None
+    
+    def _insert_business_batch(self, batch: List[Dict[str, Any]]) -> int:
+        """Insert a batch of businesses, halving it on payload-too-large, timeout
+        or row data errors so the good rows still get in; a single row that
+        violates a constraint is logged and skipped"""
+        try:
+            response = self.client.table('businesses').insert(batch).execute()
+        except Exception as e:
+            bad_data = self._is_row_data_error(e)
+            if len(batch) > 1 and (bad_data or self._is_oversized_request_error(e)):
+                mid = len(batch) // 2
+                logger.warning(f"Insert of {len(batch)} businesses rejected ({e}), retrying as two batches of {mid} and {len(batch) - mid}")
+                return self._insert_business_batch(batch[:mid]) + self._insert_business_batch(batch[mid:])
+            if bad_data:
+                logger.warning(f"Skipping business {batch[0].get('name')!r}: {e}")
+                return 0
+            raise
+        return len(response.data) if response.data else 0
+    
+    @staticmethod
+    def _is_oversized_request_error(error: Exception) -> bool:
+        """Whether an insert failed because the request was too large or too slow"""
+        message = str(error).lower()
+        return '413' in message or 'too large' in message or 'timeout' in message or 'timed out' in message
+    
+    @staticmethod
+    def _is_row_data_error(error: Exception) -> bool:
+        """Whether Postgres rejected a row's values (SQLSTATE class 22 data
+        exception or 23 constraint violation, e.g. a rating check)"""
+        code = str(getattr(error, 'code', '') or '')
+        return code.startswith(('22', '23'))
+    
+    def update_area_last_scraped(self, area_ids: List[int]) -> bool:
+        """Update the last_scraped_at timestamp for one or more areas in a single UPDATE"""
+        if not area_ids:
+            return True
+        
         try:
             response = self.client.table('areas').update({
                 'last_scraped_at': datetime.now().isoformat()
-            }).eq('id', area_id).execute()
+            }).in_('id', list(area_ids)).execute()
             
             if response.data:
-                logger.info(f"Area {area_id} last_scraped_at updated")
+                logger.info(f"Areas {list(area_ids)} last_scraped_at updated")
                 return True
             else:
-                logger.warning(f"Failed to update area {area_id} last_scraped_at")
+                logger.warning(f"Failed to update areas {list(area_ids)} last_scraped_at")
                 return False
                 
         except Exception as e:
@@ -274,7 +502,7 @@ class DatabaseManager:
     def get_admin_info(self) -> Optional[Dict[str, Any]]:
         """Get current admin information"""
         try:
-            response = self.client.table('admins').select('*').eq('id', self.admin_id).execute()
+            response = self.client.table('admins').select('*').eq('id', self._admin_key).execute()
             
             if response.data and len(response.data) > 0:
                 return response.data[0]
@@ -287,14 +515,20 @@ class DatabaseManager:
             return None
     
     def get_job_details(self, job_id: int) -> Optional[Dict[str, Any]]:
-        """Get job details with area and city information"""
+        """Get job details with area, city and country names (flat columns)"""
         try:
-            response = self.client.table('scrape_jobs').select(
-                '*, areas(name, cities(name, countries(name)))'
-            ).eq('id', job_id).execute()
+            # job_details_flat (see database_schema_updated.sql) does the
+            # area/city/country joins in Postgres instead of nested PostgREST embeds
+            try:
+                response = self.client.table('job_details_flat').select('*').eq('id', job_id).execute()
+                rows = response.data
+            except Exception as e:
+                if not _is_missing_db_object(e):
+                    raise
+                rows = self._get_job_details_embedded(job_id)
             
-            if response.data and len(response.data) > 0:
-                return response.data[0]
+            if rows and len(rows) > 0:
+                return rows[0]
             else:
                 logger.warning(f"Job {job_id} not found")
                 return None
@@ -303,6 +537,29 @@ class DatabaseManager:
             logger.error(f"Error getting job details: {e}")
             return None
     
+    def _get_job_details_embedded(self, job_id: int) -> List[Dict[str, Any]]:
+        """Fetch job details through nested embeds (no job_details_flat view),
+        flattened to the view's columns"""
+        response = self.client.table('scrape_jobs').select(
+            '*, areas(name, cities(name, countries(name)))'
+        ).eq('id', job_id).execute()
+        
+        rows = []
+        for row in response.data or []:
+            area = row.pop('areas', None) or {}
+            city = area.get('cities') or {}
+            country = city.get('countries') or {}
+            row['area_name'] = area.get('name')
+            row['city_name'] = city.get('name')
+            row['country_name'] = country.get('name')
+            rows.append(row)
+        return rows
+    
+    @staticmethod
+    def _clean_text(value, max_length: int) -> Optional[str]:
+        """Strip and truncate a text field; empty values become None"""
+        return value.strip()[:max_length] if value else None
+    
     def _validate_rating(self, rating) -> Optional[float]:
         """Validate and clean rating value"""
         if rating is None:
@@ -333,28 +590,55 @@ class DatabaseManager:
         except (ValueError, TypeError):
             return None
     
-    def _validate_coordinate(self, coordinate) -> Optional[float]:
-        """Validate and clean coordinate value"""
-        if coordinate is None:
+    def _validate_lat(self, latitude) -> Optional[float]:
+        """Validate and clean latitude value (-90 to 90)"""
+        return self._validate_coordinate(latitude, 90.0)
+    
+    def _validate_lon(self, longitude) -> Optional[float]:
+        """Validate and clean longitude value (-180 to 180)"""
+        return self._validate_coordinate(longitude, 180.0)
+    
+    @staticmethod
+    def _validate_coordinate(coordinate, limit: float) -> Optional[float]:
+        """Validate a coordinate against +/- limit"""
+        # Fast path: scraped coordinates are usually already numbers
+        if type(coordinate) is float or type(coordinate) is int:
+            coord_float = float(coordinate)
+        elif coordinate is None:
             return None
+        else:
+            try:
+                coord_float = float(coordinate)
+            except (ValueError, TypeError):
+                return None
         
+        if -limit <= coord_float <= limit:
+            return coord_float
+        logger.warning(f"Invalid coordinate value: {coordinate}")
+        return None
+    
+    def close(self):
+        """Close the pooled PostgREST HTTP client"""
         try:
-            coord_float = float(coordinate)
-            # Basic coordinate validation (latitude: -90 to 90, longitude: -180 to 180)
-            if -180 <= coord_float <= 180:
-                return coord_float
-            else:
-                logger.warning(f"Invalid coordinate value: {coordinate}")
-                return None
-        except (ValueError, TypeError):
-            return None
+            self.client.postgrest.session.close()
+        except Exception as e:
+            logger.debug(f"Error closing PostgREST session: {e}")
     
     def test_connection(self) -> bool:
         """Test database connection"""
         try:
-            # Try to fetch admin info as a connection test
-            admin_info = self.get_admin_info()
-            return admin_info is not None
+            # Trivial SELECT 1 round-trip (see ping() in database_schema_updated.sql)
+            response = self.client.rpc('ping').execute()
+            return response.data == 1
+        except Exception as e:
+            if not _is_missing_db_object(e):
+                logger.error(f"Database connection test failed: {e}")
+                return False
+        
+        # ping() is not installed: the reachable database answered, so fall back
+        # to fetching the admin record as before
+        try:
+            return self.get_admin_info() is not None
         except Exception as e:
             logger.error(f"Database connection test failed: {e}")
             return False
@@ -111,7 +111,109 @@ CREATE TABLE public.business_interactions (
   CONSTRAINT business_interactions_business_id_fkey FOREIGN KEY (business_id) REFERENCES public.businesses(id)
 );
 
+-- Cheap liveness check used by DatabaseManager.test_connection()
+CREATE OR REPLACE FUNCTION public.ping()
+RETURNS integer
+LANGUAGE sql
+STABLE
+AS $$ SELECT 1 $$;
+
+-- Scrape jobs with their area, city and country names as flat columns
+CREATE OR REPLACE VIEW public.job_details_flat AS
+SELECT j.*,
+       a.name AS area_name,
+       c.name AS city_name,
+       co.name AS country_name
+FROM public.scrape_jobs j
+LEFT JOIN public.areas a ON a.id = j.area_id
+LEFT JOIN public.cities c ON c.id = a.city_id
+LEFT JOIN public.countries co ON co.id = c.country_id;
+
+-- Claims a job and marks the admin busy in one transaction (called by the scraper
+-- via RPC). The job only moves to 'running' if it is still 'pending'; a
+-- concurrent UPDATE waits on the row lock and re-checks status = 'pending',
+-- so exactly one caller can win the claim. The admin is only marked busy once
+-- the claim succeeded.
+-- Returns 'claimed', 'not_pending' (another worker won, the job is finished or
+-- does not exist) or 'admin_not_found'.
+CREATE OR REPLACE FUNCTION public.claim_job(p_job_id integer, p_admin uuid)
+RETURNS text
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  PERFORM 1 FROM public.admins WHERE id = p_admin;
+  IF NOT FOUND THEN
+    RETURN 'admin_not_found';
+  END IF;
+
+  UPDATE public.scrape_jobs
+     SET status = 'running', assigned_to_uuid = p_admin, started_at = now()
+   WHERE id = p_job_id AND status = 'pending';
+  IF NOT FOUND THEN
+    RETURN 'not_pending';
+  END IF;
+
+  UPDATE public.admins SET status = 'busy' WHERE id = p_admin;
+  RETURN 'claimed';
+END;
+$$;
+
+-- Inserts a JSON array of business records in one set-based statement (called
+-- by the scraper via RPC for large jobs). Returns the number of rows inserted.
+CREATE OR REPLACE FUNCTION public.bulk_insert_businesses(payload jsonb)
+RETURNS integer
+LANGUAGE sql
+AS $$
+  WITH inserted AS (
+    INSERT INTO public.businesses (
+      area_id, scrape_job_id, name, address, phone, website, category,
+      rating, review_count, latitude, longitude, raw_info, status,
+      contact_status, created_at, updated_at
+    )
+    SELECT area_id, scrape_job_id, name, address, phone, website, category,
+           rating, review_count, latitude, longitude, raw_info, status,
+           contact_status, created_at, updated_at
+    FROM jsonb_to_recordset(payload) AS t(
+      area_id integer, scrape_job_id integer, name character varying,
+      address text, phone character varying, website character varying,
+      category character varying, rating numeric, review_count integer,
+      latitude numeric, longitude numeric, raw_info jsonb,
+      status character varying, contact_status character varying,
+      created_at timestamp without time zone, updated_at timestamp without time zone
+    )
+    RETURNING 1
+  )
+  SELECT count(*)::integer FROM inserted;
+$$;
+
+-- Stamps completed_at when a job moves to 'completed' or 'failed', and the
+-- logs timestamp whenever logs are written, so the scraper does not have to
+-- send client-side clock values with every status update.
+CREATE OR REPLACE FUNCTION public.scrape_jobs_stamp_completion()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF NEW.status IN ('completed', 'failed')
+     AND OLD.status IS DISTINCT FROM NEW.status THEN
+    NEW.completed_at := now();
+  END IF;
+
+  IF NEW.logs IS DISTINCT FROM OLD.logs AND NEW.logs IS NOT NULL THEN
+    NEW.logs := NEW.logs || jsonb_build_object('timestamp', now());
+  END IF;
+
+  RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS scrape_jobs_stamp_completion ON public.scrape_jobs;
+CREATE TRIGGER scrape_jobs_stamp_completion
+BEFORE UPDATE ON public.scrape_jobs
+FOR EACH ROW EXECUTE FUNCTION public.scrape_jobs_stamp_completion();
+
 -- Migration script to update existing data (if needed)
+
 -- Run this if you have existing integer admin IDs that need to be converted
 
 -- Example: If you had admin with id=1, you can insert a UUID version:
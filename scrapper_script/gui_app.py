@@ -9,15 +9,15 @@ from tkinter import ttk, messagebox, scrolledtext
 import threading
 import queue
 import logging
+import logging.handlers
 import os
-import sys
 import json
+import atexit
 import webbrowser
 from datetime import datetime
 from typing import Dict, Any
-import configparser
 from pathlib import Path
-import shutil
+from types import MappingProxyType
 
 # Use the new persistent browser manager to handle bundled browsers properly
 # This prevents re-downloading on each machine
@@ -28,12 +28,54 @@ except Exception as e:
 	# Log the error but don't fail
 	logging.warning(f"Failed to setup persistent browsers: {e}")
 
-# Import the server components
-from server import ProductionServer
-from database_manager import DatabaseManager
-from webhook_handler import WebhookHandler
-from browser_installer import check_browsers_installed, install_browsers as install_playwright_browsers, get_browser_status
-from persistent_browser_manager import get_browser_status as get_persistent_browser_status, check_browsers_available
+# Settings used when scraper_config.json is missing or leaves a key out
+_DEFAULT_CONFIG = MappingProxyType({
+	"supabase_url": "",
+	"supabase_key": "",
+	"admin_id": "",
+	"server_host": "0.0.0.0",
+	"server_port": "5000",
+	"n8n_webhookC": "http://localhost:5678/webhook/job-completion",
+	"n8n_webhookT": "http://localhost:5678/webhook/webhook-test-connection",
+	"max_results": "5"
+})
+
+# The server components (Flask, Supabase, Playwright) are imported where they
+# are first used so the window can appear before they load
+
+
+class _GuiLogHandler(logging.Handler):
+	"""Formats records on the logging listener thread and hands the text to the GUI queue"""
+	
+	def __init__(self, gui_queue: queue.Queue):
+		super().__init__()
+		self.gui_queue = gui_queue
+		self.dropped = 0
+		self.setFormatter(logging.Formatter('[%(levelname)s] %(message)s'))
+	
+	def emit(self, record):
+		line = self.format(record) + "\n"
+		try:
+			self.gui_queue.put_nowait(line)
+		except queue.Full:
+			# The view has fallen behind: drop the oldest line rather than block
+			# the thread that logged or let the backlog grow
+			try:
+				self.gui_queue.get_nowait()
+			except queue.Empty:
+				pass
+			with self.lock:
+				self.dropped += 1
+			try:
+				self.gui_queue.put_nowait(line)
+			except queue.Full:
+				pass
+	
+	def take_dropped(self) -> int:
+		"""Return and reset the number of lines dropped since the last call"""
+		with self.lock:
+			dropped, self.dropped = self.dropped, 0
+		return dropped
 
 
 class ScraperGUI:
@@ -44,23 +86,47 @@ class ScraperGUI:
 		self.root.title("Google Maps Scraper Server - Admin Panel")
 		self.root.geometry("900x700")
 		self.root.resizable(True, True)
+		self.started_at = datetime.now()
+		self.initialized_tabs = set()  # Notebook tabs whose content has been filled in
 		
 		# Server and logging
 		self.server = None
 		self.server_thread = None
-		self.log_queue = queue.Queue()
+		self.log_queue = queue.Queue(maxsize=8192)  # Formatted lines waiting for the log view
+		self.gui_log_handler = None
+		self.log_lines = 0  # Complete lines in the log view, tracked to avoid querying Tk
+		self.log_listener = None
+		self.record_queue_handler = None
+		self.console_log_handlers = []
+		self.buffered_log_handlers = []
+		# Callables posted by worker threads for the Tk thread; Tk itself is only
+		# ever touched from the Tk thread
+		self.ui_calls = queue.SimpleQueue()
 		self.is_server_running = False
 		
+		# Cached clients, rebuilt when the settings they were built from change
+		self.db_manager = None
+		self.db_manager_key = None
+		self.webhook_handler = None
+		self.webhook_handler_key = None
+		self.http_session = None  # requests.Session for health checks, created on first use
+		
+		# What the status and info displays last showed, to skip no-op redraws
+		self.server_status_key = None
+		self.server_info_key = None
+		
 		# Configuration
 		self.config_file = "scraper_config.json"
 		self.config = self.load_config()
+		self.update_server_urls()
 		
 		# Setup GUI
 		self.setup_gui()
 		self.setup_logging()
 		
-		# Start log processing
-		self.process_log_queue()
+		# Start the UI pump: every 100 ms the Tk thread runs calls posted by
+		# worker threads and shows queued log lines, so no thread waits on Tk
+		self.pump_ui()
 		
 		# Load saved configuration
 		self.load_saved_config()
@@ -71,9 +137,13 @@ class ScraperGUI:
 	def setup_gui(self):
 		"""Setup the main GUI components"""
 		
+		# Keep the window hidden while it is built so geometry is solved once
+		self.root.withdraw()
+		
 		# Create notebook for tabs
 		self.notebook = ttk.Notebook(self.root)
 		self.notebook.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+		self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
 		
 		# Configuration Tab
 		self.config_frame = ttk.Frame(self.notebook)
@@ -93,10 +163,16 @@ class ScraperGUI:
 		# Status bar
 		self.status_bar = ttk.Label(self.root, text="Server Status: Stopped", relief=tk.SUNKEN)
 		self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+		
+		self.root.update_idletasks()
+		self.root.deiconify()
 
 	def setup_config_tab(self):
 		"""Setup configuration tab"""
 		
+		# One variable per config key; the entries below are bound to them
+		self.config_vars = {key: tk.StringVar() for key in _DEFAULT_CONFIG}
+		
 		# Main configuration frame
 		main_frame = ttk.LabelFrame(self.config_frame, text="Server Configuration", padding=10)
 		main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
@@ -106,15 +182,15 @@ class ScraperGUI:
 		db_frame.pack(fill=tk.X, pady=(0, 10))
 		
 		ttk.Label(db_frame, text="Supabase URL:").grid(row=0, column=0, sticky=tk.W, pady=2)
-		self.supabase_url = ttk.Entry(db_frame, width=60)
+		self.supabase_url = ttk.Entry(db_frame, width=60, textvariable=self.config_vars["supabase_url"])
 		self.supabase_url.grid(row=0, column=1, padx=(10, 0), pady=2)
 		
 		ttk.Label(db_frame, text="Supabase API Key:").grid(row=1, column=0, sticky=tk.W, pady=2)
-		self.supabase_key = ttk.Entry(db_frame, width=60, show="*")
+		self.supabase_key = ttk.Entry(db_frame, width=60, textvariable=self.config_vars["supabase_key"], show="*")
 		self.supabase_key.grid(row=1, column=1, padx=(10, 0), pady=2)
 		
 		ttk.Label(db_frame, text="Admin ID:").grid(row=2, column=0, sticky=tk.W, pady=2)
-		self.admin_id = ttk.Entry(db_frame, width=20)
+		self.admin_id = ttk.Entry(db_frame, width=20, textvariable=self.config_vars["admin_id"])
 		self.admin_id.grid(row=2, column=1, sticky=tk.W, padx=(10, 0), pady=2)
 		
 		# Server Configuration
@@ -122,11 +198,11 @@ class ScraperGUI:
 		server_frame.pack(fill=tk.X, pady=(0, 10))
 		
 		ttk.Label(server_frame, text="Server Host:").grid(row=0, column=0, sticky=tk.W, pady=2)
-		self.server_host = ttk.Entry(server_frame, width=30)
+		self.server_host = ttk.Entry(server_frame, width=30, textvariable=self.config_vars["server_host"])
 		self.server_host.grid(row=0, column=1, padx=(10, 0), pady=2)
 		
 		ttk.Label(server_frame, text="Server Port:").grid(row=1, column=0, sticky=tk.W, pady=2)
-		self.server_port = ttk.Entry(server_frame, width=30)
+		self.server_port = ttk.Entry(server_frame, width=30, textvariable=self.config_vars["server_port"])
 		self.server_port.grid(row=1, column=1, padx=(10, 0), pady=2)
 		
 		# N8N Configuration
@@ -134,11 +210,11 @@ class ScraperGUI:
 		n8n_frame.pack(fill=tk.X, pady=(0, 10))
 		
 		ttk.Label(n8n_frame, text="Job Completion Webhook:").grid(row=0, column=0, sticky=tk.W, pady=2)
-		self.n8n_webhookC = ttk.Entry(n8n_frame, width=60)
+		self.n8n_webhookC = ttk.Entry(n8n_frame, width=60, textvariable=self.config_vars["n8n_webhookC"])
 		self.n8n_webhookC.grid(row=0, column=1, padx=(10, 0), pady=2)
 		
 		ttk.Label(n8n_frame, text="Test Connection Webhook:").grid(row=1, column=0, sticky=tk.W, pady=2)
-		self.n8n_webhookT = ttk.Entry(n8n_frame, width=60)
+		self.n8n_webhookT = ttk.Entry(n8n_frame, width=60, textvariable=self.config_vars["n8n_webhookT"])
 		self.n8n_webhookT.grid(row=1, column=1, padx=(10, 0), pady=2)
 		
 		# Scraping Configuration
@@ -146,7 +222,7 @@ class ScraperGUI:
 		scraping_frame.pack(fill=tk.X, pady=(0, 10))
 		
 		ttk.Label(scraping_frame, text="Default Max Results:").grid(row=0, column=0, sticky=tk.W, pady=2)
-		self.max_results = ttk.Entry(scraping_frame, width=30)
+		self.max_results = ttk.Entry(scraping_frame, width=30, textvariable=self.config_vars["max_results"])
 		self.max_results.grid(row=0, column=1, padx=(10, 0), pady=2)
 		
 		# Buttons
@@ -201,9 +277,6 @@ class ScraperGUI:
 		
 		self.info_text = scrolledtext.ScrolledText(info_frame, height=8, wrap=tk.WORD)
 		self.info_text.pack(fill=tk.BOTH, expand=True)
-		
-		# Add server info
-		self.update_server_info()
 	
 	def setup_logs_tab(self):
 		"""Setup logs tab"""
@@ -225,104 +298,157 @@ class ScraperGUI:
 		
 		self.log_text = scrolledtext.ScrolledText(log_frame, wrap=tk.WORD, font=("Consolas", 9))
 		self.log_text.pack(fill=tk.BOTH, expand=True)
+	
+	def on_tab_changed(self, event=None):
+		"""Fill the Server Control and Server Logs tabs the first time they are shown"""
 		
-		# Add initial message
-		self.log_text.insert(tk.END, f"[{datetime.now().strftime('%H:%M:%S')}] Google Maps Scraper GUI started\n")
-		self.log_text.insert(tk.END, f"[{datetime.now().strftime('%H:%M:%S')}] Configure settings and start the server\n\n")
+		tab = self.notebook.select()
+		if tab in self.initialized_tabs:
+			return
+		self.initialized_tabs.add(tab)
+		
+		if tab == str(self.control_frame):
+			# Add server info
+			self.update_server_info()
+		elif tab == str(self.logs_frame):
+			# Add initial message above anything logged before the tab was opened
+			started = self.started_at.strftime('%H:%M:%S')
+			self.log_text.insert('1.0', f"[{started}] Google Maps Scraper GUI started\n[{started}] Configure settings and start the server\n\n")
+			self.log_lines += 3
 	
 	def setup_logging(self):
 		"""Setup logging to capture server logs"""
 		
-		# Create custom handler that puts logs in queue
-		class QueueHandler(logging.Handler):
-			def __init__(self, log_queue):
-				super().__init__()
-				self.log_queue = log_queue
-			
-			def emit(self, record):
-				self.log_queue.put(record)
-		
 		# Setup logging
 		logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 		
-		# Add our queue handler to root logger
-		queue_handler = QueueHandler(self.log_queue)
-		logging.getLogger().addHandler(queue_handler)
+		# Loggers only enqueue records; formatting and output happen on the
+		# listener thread so logging calls never wait on the console or the GUI
+		root_logger = logging.getLogger()
+		handlers = list(root_logger.handlers)
+		for handler in handlers:
+			root_logger.removeHandler(handler)
+		
+		# Console output is buffered and written in batches; anything at
+		# WARNING or above flushes the buffer straight away
+		self.console_log_handlers = handlers
+		self.buffered_log_handlers = [
+			logging.handlers.MemoryHandler(capacity=512, flushLevel=logging.WARNING, target=handler)
+			for handler in handlers
+		]
+		atexit.register(self.flush_logs)
+		
+		record_queue = queue.Queue(-1)
+		self.record_queue_handler = logging.handlers.QueueHandler(record_queue)
+		root_logger.addHandler(self.record_queue_handler)
+		self.gui_log_handler = _GuiLogHandler(self.log_queue)
+		self.log_listener = logging.handlers.QueueListener(
+			record_queue, *self.buffered_log_handlers, self.gui_log_handler, respect_handler_level=True
+		)
+		self.log_listener.start()
+	
+	def flush_logs(self):
+		"""Write out console log records still held in memory"""
+		
+		for handler in self.buffered_log_handlers:
+			handler.flush()
 	
-	def process_log_queue(self):
-		"""Process log messages from queue and display in GUI"""
+	def shutdown_logging(self):
+		"""Stop the log listener once the Tk loop has exited"""
+		
+		if not self.log_listener:
+			return
+		
+		# Later records (e.g. from the server thread) go straight to the console
+		root_logger = logging.getLogger()
+		root_logger.removeHandler(self.record_queue_handler)
+		for handler in self.console_log_handlers:
+			root_logger.addHandler(handler)
 		
+		# The listener never waits on Tk, so joining it cannot block
+		self.log_listener.stop()
+		self.log_listener = None
+		self.flush_logs()
+	
+	def call_on_ui(self, func, *args):
+		"""Run func(*args) on the Tk thread at the next pump (safe from any thread)"""
+		
+		self.ui_calls.put((func, args))
+	
+	def drain_log_queue(self):
+		"""Display queued log messages in the GUI"""
+		
+		# Drain everything queued since the last pump and write it in one insert
+		messages = []
 		try:
 			while True:
-				record = self.log_queue.get_nowait()
-				message = f"[{record.levelname}] {record.getMessage()}\n"
-				
-				self.log_text.insert(tk.END, message)
-				
-				# Auto-scroll to bottom if enabled
-				if self.auto_scroll.get():
-					self.log_text.see(tk.END)
-				
-				# Limit log size (keep last 1000 lines)
-				lines = int(self.log_text.index('end-1c').split('.')[0])
-				if lines > 1000:
-					self.log_text.delete('1.0', '100.0')
-				
+				messages.append(self.log_queue.get_nowait())
 		except queue.Empty:
 			pass
 		
+		if messages:
+			text = "".join(messages)
+			self.log_text.insert(tk.END, text)
+			self.log_lines += text.count('\n')
+			
+			# Auto-scroll to bottom if enabled
+			if self.auto_scroll.get():
+				self.log_text.see(tk.END)
+			
+			# Limit log size (keep last 1000 lines)
+			if self.log_lines > 1000:
+				excess = self.log_lines - 1000
+				self.log_text.delete('1.0', f'{excess + 1}.0')
+				self.log_lines = 1000
+	
+	def pump_ui(self):
+		"""100 ms poll on the Tk thread: run posted calls, then show queued log lines"""
+		
+		while True:
+			try:
+				func, args = self.ui_calls.get_nowait()
+			except queue.Empty:
+				break
+			try:
+				func(*args)
+			except Exception as e:
+				logging.error(f"UI callback failed: {e}")
+		
+		# Report lines dropped under load as one summary line per poll
+		dropped = self.gui_log_handler.take_dropped() if self.gui_log_handler else 0
+		if dropped:
+			try:
+				self.log_queue.put_nowait(f"[WARNING] {dropped} log lines dropped (log view fell behind)\n")
+			except queue.Full:
+				pass
+		
+		self.drain_log_queue()
+		
 		# Schedule next check
-		self.root.after(100, self.process_log_queue)
+		self.root.after(100, self.pump_ui)
 	
 	def load_config(self) -> Dict[str, Any]:
 		"""Load configuration from file"""
 		
-		default_config = {
-			"supabase_url": "",
-			"supabase_key": "",
-			"admin_id": "",
-			"server_host": "0.0.0.0",
-			"server_port": "5000",
-			"n8n_webhookC": "http://localhost:5678/webhook/job-completion",
-			"n8n_webhookT": "http://localhost:5678/webhook/webhook-test-connection",
-			"max_results": "5"
-		}
-		
+		saved_config = {}
 		if os.path.exists(self.config_file):
 			try:
-				with open(self.config_file, 'r') as f:
-					saved_config = json.load(f)
-					default_config.update(saved_config)
+				saved_config = json.loads(Path(self.config_file).read_bytes())
 			except Exception as e:
 				logging.error(f"Failed to load config: {e}")
 		
-		return default_config
+		return {**_DEFAULT_CONFIG, **saved_config}
 	
 	def load_saved_config(self):
 		"""Load saved configuration into GUI fields"""
 		
-		self.supabase_url.insert(0, self.config.get("supabase_url", ""))
-		self.supabase_key.insert(0, self.config.get("supabase_key", ""))
-		self.admin_id.insert(0, self.config.get("admin_id", ""))
-		self.server_host.insert(0, self.config.get("server_host", "0.0.0.0"))
-		self.server_port.insert(0, self.config.get("server_port", "5000"))
-		self.n8n_webhookC.insert(0, self.config.get("n8n_webhookC", "http://localhost:5678/webhook/job-completion"))
-		self.n8n_webhookT.insert(0, self.config.get("n8n_webhookT", "http://localhost:5678/webhook/webhook-test-connection"))
-		self.max_results.insert(0, self.config.get("max_results", "5"))
+		for key, var in self.config_vars.items():
+			var.set(self.config.get(key, _DEFAULT_CONFIG[key]))
 	
 	def save_config(self):
 		"""Save configuration"""
 		
-		self.config = {
-			"supabase_url": self.supabase_url.get().strip(),
-			"supabase_key": self.supabase_key.get().strip(),
-			"admin_id": self.admin_id.get().strip(),
-			"server_host": self.server_host.get().strip(),
-			"server_port": self.server_port.get().strip(),
-			"n8n_webhookC": self.n8n_webhookC.get().strip(),
-			"n8n_webhookT": self.n8n_webhookT.get().strip(),
-			"max_results": self.max_results.get().strip()
-		}
+		self.config = {key: var.get().strip() for key, var in self.config_vars.items()}
 		
 		# Validate configuration
 		if not self.validate_config():
@@ -384,6 +510,39 @@ class ScraperGUI:
 		os.environ["N8N_WEBHOOK_T"] = self.config["n8n_webhookT"]
 		os.environ["DEFAULT_MAX_RESULTS"] = self.config["max_results"]
 		os.environ["CACHE_TTL_MINUTES"] = "0"  # Always disable caching for job processing
+		self.update_server_urls()
+	
+	def update_server_urls(self):
+		"""Build the server URLs from config (0.0.0.0 is reached through localhost)"""
+		
+		host = self.config["server_host"]
+		port = self.config["server_port"]
+		self.server_url = f"http://{host}:{port}"
+		self.local_server_url = f"http://localhost:{port}" if host == '0.0.0.0' else self.server_url
+	
+	def get_db_manager(self):
+		"""Return a DatabaseManager for the current settings, reusing the last one"""
+		
+		key = (self.config["supabase_url"], self.config["supabase_key"], self.config["admin_id"])
+		if self.db_manager is None or self.db_manager_key != key:
+			from database_manager import DatabaseManager
+			if self.db_manager is not None:
+				self.db_manager.close()  # Release the old client's pooled connections
+			self.db_manager = DatabaseManager()
+			self.db_manager_key = key
+		return self.db_manager
+	
+	def get_webhook_handler(self):
+		"""Return a WebhookHandler for the current settings, reusing the last one"""
+		
+		key = (self.config["n8n_webhookC"], self.config["n8n_webhookT"])
+		if self.webhook_handler is None or self.webhook_handler_key != key:
+			from webhook_handler import WebhookHandler
+			if self.webhook_handler is not None:
+				self.webhook_handler.close()  # Release the old clients' pooled connections
+			self.webhook_handler = WebhookHandler()
+			self.webhook_handler_key = key
+		return self.webhook_handler
 	
 	def test_database(self):
 		"""Test database connection"""
@@ -393,14 +552,15 @@ class ScraperGUI:
 		
 		self.update_environment()
 		
-		try:
-			db_manager = DatabaseManager()
-			db_manager.mark_admin_active()
-			messagebox.showinfo("Success", "Database connection successful!")
-			logging.info("Database connection test successful")
-		except Exception as e:
-			messagebox.showerror("Database Error", f"Database connection failed: {e}")
-			logging.error(f"Database connection test failed: {e}")
+		def show_result(result, error):
+			if error:
+				messagebox.showerror("Database Error", f"Database connection failed: {error}")
+				logging.error(f"Database connection test failed: {error}")
+			else:
+				messagebox.showinfo("Success", "Database connection successful!")
+				logging.info("Database connection test successful")
+		
+		self.run_in_background(lambda: self.get_db_manager().mark_admin_active(), show_result)
 	
 	def test_webhook(self):
 		"""Test webhook connection"""
@@ -410,22 +570,36 @@ class ScraperGUI:
 		
 		self.update_environment()
 		
-		try:
-			webhook_handler = WebhookHandler()
-			success = webhook_handler.test_webhook_connection()
-			if success:
+		def show_result(success, error):
+			if error:
+				messagebox.showerror("Webhook Error", f"Webhook test failed: {error}")
+				logging.error(f"Webhook test failed: {error}")
+			elif success:
 				messagebox.showinfo("Success", "Webhook connection successful!")
 				logging.info("Webhook connection test successful")
 			else:
 				messagebox.showerror("Webhook Error", "Webhook connection failed - check N8N server")
 				logging.error("Webhook connection test failed")
-		except Exception as e:
-			messagebox.showerror("Webhook Error", f"Webhook test failed: {e}")
-			logging.error(f"Webhook test failed: {e}")
+		
+		self.run_in_background(lambda: self.get_webhook_handler().test_webhook_connection(), show_result)
+	
+	def run_in_background(self, work, on_done):
+		"""Run work() on a worker thread and hand its result to on_done(result, error) on the UI thread"""
+		
+		def worker():
+			try:
+				result, error = work(), None
+			except Exception as e:
+				result, error = None, e
+			self.call_on_ui(on_done, result, error)
+		
+		threading.Thread(target=worker, daemon=True).start()
 	
 	def install_browsers(self):
 		"""Install Playwright browsers using official method with real-time progress"""
 		
+		from persistent_browser_manager import get_browser_status as get_persistent_browser_status
+		
 		# Check if browsers are already available (bundled or persistent)
 		status = get_persistent_browser_status()
 		if status["available"]:
@@ -483,16 +657,36 @@ class ScraperGUI:
 		# Variables for thread communication
 		installation_cancelled = threading.Event()
 		
+		# Progress ticks from the installer are coalesced: only the latest
+		# one is kept and shown at the next UI pump
+		pending_progress = [None]
+		flush_scheduled = threading.Event()
+		
 		def update_progress(message, progress):
+			"""Record the latest progress and schedule a UI refresh if none is pending"""
+			if installation_cancelled.is_set():
+				return
+			
+			pending_progress[0] = (message, progress)
+			if not flush_scheduled.is_set():
+				flush_scheduled.set()
+				self.call_on_ui(flush_progress)
+		
+		def flush_progress():
 			"""Update progress bar and status in UI thread"""
-			def update_ui():
+			flush_scheduled.clear()
+			message, progress = pending_progress[0]
+			if installation_cancelled.is_set():
+				return
+			
+			try:
 				if progress >= 0:
 					progress_var.set(progress)
 					percent_label.config(text=f"{int(progress)}%")
 					status_label.config(text=message)
 					
 					# Enable cancel button only during non-critical phases
-					if progress < 70 and not installation_cancelled.is_set():
+					if progress < 70:
 						cancel_button.config(state='normal')
 					else:
 						cancel_button.config(state='disabled')
@@ -500,11 +694,8 @@ class ScraperGUI:
 					# Error case
 					status_label.config(text=message, foreground='red')
 					cancel_button.config(text="Close", state='normal')
-				
-				progress_window.update()
-			
-			if not installation_cancelled.is_set():
-				self.root.after(0, update_ui)
+			except tk.TclError:
+				pass  # Progress window already closed
 		
 		def cancel_installation():
 			"""Cancel the installation process"""
@@ -517,12 +708,13 @@ class ScraperGUI:
 		def install_in_thread():
 			"""Run installation in background thread with progress updates"""
 			try:
+				from browser_installer import install_browsers as install_playwright_browsers
 				success = install_playwright_browsers(progress_callback=update_progress)
 				if not installation_cancelled.is_set():
-					self.root.after(0, lambda: installation_complete(success, None))
+					self.call_on_ui(installation_complete, success, None)
 			except Exception as e:
 				if not installation_cancelled.is_set():
-					self.root.after(0, lambda: installation_complete(False, str(e)))
+					self.call_on_ui(installation_complete, False, str(e))
 		
 		def installation_complete(success, error_msg):
 			"""Handle installation completion"""
@@ -557,6 +749,8 @@ class ScraperGUI:
 			messagebox.showwarning("Server Warning", "Server is already running")
 			return
 		
+		from persistent_browser_manager import get_browser_status as get_persistent_browser_status
+		
 		# Check if browsers are available using the persistent manager
 		status = get_persistent_browser_status()
 		browsers_available = status["available"]
@@ -579,20 +773,20 @@ class ScraperGUI:
 		self.update_environment()
 		# Mark admin active when starting the server
 		try:
-			db_manager = DatabaseManager()
-			db_manager.mark_admin_active()
+			self.get_db_manager().mark_admin_active()
 		except Exception as e:
 			logging.warning(f"Failed to mark admin active on start: {e}")
 		
 		def run_server():
 			try:
+				from server import ProductionServer
 				self.server = ProductionServer()
 				host = self.config["server_host"]
 				port = int(self.config["server_port"])
 				self.server.run(host=host, port=port)
 			except Exception as e:
 				logging.error(f"Server error: {e}")
-				self.root.after(0, lambda: self.server_stopped_callback(str(e)))
+				self.call_on_ui(self.server_stopped_callback, str(e))
 		
 		# Start server in separate thread
 		self.server_thread = threading.Thread(target=run_server, daemon=True)
@@ -619,8 +813,7 @@ class ScraperGUI:
 		
 		# Mark admin inactive when stopping the server
 		try:
-			db_manager = DatabaseManager()
-			db_manager.mark_admin_inactive()
+			self.get_db_manager().mark_admin_inactive()
 		except Exception as e:
 			logging.warning(f"Failed to mark admin inactive on stop: {e}")
 		self.is_server_running = False
@@ -637,10 +830,10 @@ class ScraperGUI:
 		
 		# Mark admin inactive on unexpected stop
 		try:
-			db_manager = DatabaseManager()
-			db_manager.mark_admin_inactive()
+			self.get_db_manager().mark_admin_inactive()
 		except Exception as e:
 			logging.warning(f"Failed to mark admin inactive on crash: {e}")
+		self.flush_logs()
 		self.is_server_running = False
 		self.update_server_status()
 		messagebox.showerror("Server Error", f"Server stopped unexpectedly: {error_msg}")
@@ -648,11 +841,15 @@ class ScraperGUI:
 	def update_server_status(self):
 		"""Update server status display"""
 		
+		key = (self.is_server_running, self.config['server_host'], self.config['server_port'])
+		if key == self.server_status_key:
+			return
+		self.server_status_key = key
+		
 		if self.is_server_running:
 			self.status_label.config(text="Server is running", foreground="green")
 			self.status_bar.config(text="Server Status: Running")
-			server_url = f"http://{self.config['server_host']}:{self.config['server_port']}"
-			self.server_url_label.config(text=f"Server URL: {server_url}")
+			self.server_url_label.config(text=f"Server URL: {self.server_url}")
 			
 			self.start_button.config(state=tk.DISABLED)
 			self.stop_button.config(state=tk.NORMAL)
@@ -669,6 +866,12 @@ class ScraperGUI:
 	def update_server_info(self):
 		"""Update server information display"""
 		
+		# The text only depends on these settings; skip re-rendering when unchanged
+		key = tuple(self.config.get(name) for name in ('supabase_url', 'admin_id', 'server_host', 'server_port', 'max_results', 'n8n_webhook'))
+		if key == self.server_info_key:
+			return
+		self.server_info_key = key
+		
 		info = f"""Google Maps Scraper Server - Admin Panel
 
 Version: 6.1.0 - N8N Integration with GUI
@@ -729,11 +932,7 @@ Support: For technical support and updates, contact your system administrator.
 			messagebox.showwarning("Server Warning", "Server is not running")
 			return
 		
-		url = f"http://{self.config['server_host']}:{self.config['server_port']}/health"
-		if self.config['server_host'] == '0.0.0.0':
-			url = f"http://localhost:{self.config['server_port']}/health"
-		
-		webbrowser.open(url)
+		webbrowser.open(f"{self.local_server_url}/health")
 	
 	def copy_server_url(self):
 		"""Copy server URL to clipboard"""
@@ -742,10 +941,7 @@ Support: For technical support and updates, contact your system administrator.
 			messagebox.showwarning("Server Warning", "Server is not running")
 			return
 		
-		url = f"http://{self.config['server_host']}:{self.config['server_port']}"
-		if self.config['server_host'] == '0.0.0.0':
-			url = f"http://localhost:{self.config['server_port']}"
-		
+		url = self.local_server_url
 		self.root.clipboard_clear()
 		self.root.clipboard_append(url)
 		messagebox.showinfo("Copied", f"Server URL copied to clipboard:\n{url}")
@@ -757,14 +953,27 @@ Support: For technical support and updates, contact your system administrator.
 			messagebox.showwarning("Server Warning", "Server is not running")
 			return
 		
-		try:
-			import requests
-			url = f"http://localhost:{self.config['server_port']}/health"
-			response = requests.get(url, timeout=5)
-			health_data = response.json()
-			
-			# Format health data
-			health_info = f"""Server Health Check
+		url = f"{self.local_server_url}/health"
+		
+		def fetch_health():
+			# Reuse one session so repeated checks keep the connection open
+			if self.http_session is None:
+				import requests
+				self.http_session = requests.Session()
+			response = self.http_session.get(url, timeout=5)
+			return response.json()
+		
+		self.run_in_background(fetch_health, self.show_health_check)
+	
+	def show_health_check(self, health_data, error):
+		"""Display the health check result fetched by view_health_check"""
+		
+		if error:
+			messagebox.showerror("Health Check Error", f"Failed to get health check: {error}")
+			return
+		
+		# Format health data
+		health_info = f"""Server Health Check
 ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
 Status: {health_data.get('status', 'Unknown')}
@@ -779,25 +988,23 @@ Admin ID: {health_data.get('admin_id', 'Unknown')}
 Features:
 {chr(10).join(['• ' + feature for feature in health_data.get('features', [])])}
 """
-			
-			# Show in new window
-			health_window = tk.Toplevel(self.root)
-			health_window.title("Server Health Check")
-			health_window.geometry("600x500")
-			
-			health_text = scrolledtext.ScrolledText(health_window, wrap=tk.WORD, font=("Consolas", 10))
-			health_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-			health_text.insert(1.0, health_info)
-			health_text.config(state=tk.DISABLED)
-			
-		except Exception as e:
-			messagebox.showerror("Health Check Error", f"Failed to get health check: {e}")
+		
+		# Show in new window
+		health_window = tk.Toplevel(self.root)
+		health_window.title("Server Health Check")
+		health_window.geometry("600x500")
+		
+		health_text = scrolledtext.ScrolledText(health_window, wrap=tk.WORD, font=("Consolas", 10))
+		health_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+		health_text.insert(1.0, health_info)
+		health_text.config(state=tk.DISABLED)
 	
 	def clear_logs(self):
 		"""Clear log display"""
 		
 		self.log_text.delete(1.0, tk.END)
 		self.log_text.insert(tk.END, f"[{datetime.now().strftime('%H:%M:%S')}] Logs cleared\n")
+		self.log_lines = 1
 	
 	def export_logs(self):
 		"""Export logs to file"""
@@ -812,8 +1019,11 @@ Features:
 		
 		if filename:
 			try:
-				with open(filename, 'w') as f:
-					f.write(self.log_text.get(1.0, tk.END))
+				# Copy the view a chunk of lines at a time rather than as one string
+				with open(filename, 'w', buffering=1 << 16) as f:
+					last_line = self.log_lines + 1
+					for start in range(1, last_line + 1, 256):
+						f.write(self.log_text.get(f'{start}.0', f'{min(start + 256, last_line + 1)}.0'))
 				messagebox.showinfo("Success", f"Logs exported to {filename}")
 			except Exception as e:
 				messagebox.showerror("Export Error", f"Failed to export logs: {e}")
@@ -823,20 +1033,30 @@ Features:
 		
 		# Attempt to mark admin inactive on GUI close
 		try:
-			db_manager = DatabaseManager()
-			db_manager.mark_admin_inactive()
+			self.get_db_manager().mark_admin_inactive()
 		except Exception as e:
 			logging.warning(f"Failed to mark admin inactive on close: {e}")
 		if self.is_server_running:
-			if messagebox.askokcancel("Quit", "Server is running. Do you want to quit anyway?"):
-				self.root.destroy()
-		else:
-			self.root.destroy()
+			if not messagebox.askokcancel("Quit", "Server is running. Do you want to quit anyway?"):
+				return
+		
+		if self.http_session:
+			self.http_session.close()
+		if self.server:
+			# Sending webhook completions still waiting in a batch can take a
+			# while: hide the window now and destroy it once that is done
+			self.root.withdraw()
+			self.run_in_background(self.server.shutdown, lambda result, error: self.root.destroy())
+			return
+		self.root.destroy()
 	
 	def run(self):
 		"""Run the GUI application"""
 		
-		self.root.mainloop()
+		try:
+			self.root.mainloop()
+		finally:
+			self.shutdown_logging()
 
 
 def main():
@@ -9,12 +9,54 @@ import sys
 import logging
 import platform
 import shutil
+import time
+from functools import lru_cache
 from pathlib import Path
+from typing import Tuple
 
 logger = logging.getLogger(__name__)
 
+# Result of the last Chromium launch test, keyed on the browser directory's
+# mtime so an install or removal there invalidates it before the TTL runs out
+_AVAILABILITY_TTL_SECONDS = 300.0
+_availability_cache = {"key": None, "ok": None, "ts": 0.0}
+
+def _dir_nonempty(path: Path) -> bool:
+    """Return True if path is a directory with at least one entry (reads a single entry)"""
+    try:
+        with os.scandir(path) as entries:
+            return next(entries, None) is not None
+    except OSError:
+        return False
+
+# Read/write chunk for the copy fallback; the default 1 MiB on Windows means
+# hundreds of round trips for the Chromium binaries
+_COPY_BUFSIZE = 4 * 1024 * 1024
+
+def _copy_file(src, dst, *, follow_symlinks=True):
+    """Copy file contents and metadata, using a large buffer where the OS has no zero-copy path"""
+    if sys.platform != "win32":
+        # Linux and macOS copy in the kernel (sendfile / fcopyfile), which beats any buffer size
+        return shutil.copy2(src, dst, follow_symlinks=follow_symlinks)
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        shutil.copyfileobj(fsrc, fdst, length=_COPY_BUFSIZE)
+    shutil.copystat(src, dst, follow_symlinks=follow_symlinks)
+    return dst
+
+def _link_or_copy(src, dst, *, follow_symlinks=True):
+    """Hardlink src to dst, copying instead when linking is not possible (e.g. across drives)"""
+    try:
+        os.link(src, dst)
+    except FileExistsError:
+        if not os.path.samefile(src, dst):
+            _copy_file(src, dst, follow_symlinks=follow_symlinks)
+    except OSError:
+        _copy_file(src, dst, follow_symlinks=follow_symlinks)
+    return dst
+
+@lru_cache(maxsize=1)
 def get_app_data_dir() -> Path:
-    """Get a persistent app data directory for browsers across runs"""
+    """Get a persistent app data directory for browsers across runs (resolved once)"""
     try:
         if platform.system() == "Windows":
             # Use %APPDATA% on Windows
@@ -39,8 +81,13 @@ def get_app_data_dir() -> Path:
         fallback_dir.mkdir(exist_ok=True)
         return fallback_dir
 
-def get_bundle_browser_path() -> Path:
-    """Get path to bundled browsers in the executable"""
+@lru_cache(maxsize=1)
+def get_bundle_browser_path() -> Tuple[Path, bool]:
+    """
+    Get path to bundled browsers in the executable (the bundle never changes, so resolved once)
+    
+    Returns (path, True) for the first non-empty candidate, or (Path(), False) if none
+    """
     if hasattr(sys, '_MEIPASS'):
         # Check different possible paths in the bundle
         bundle_dir = Path(sys._MEIPASS)
@@ -52,13 +99,13 @@ def get_bundle_browser_path() -> Path:
         ]
         
         for path in candidates:
-            if path.exists() and any(path.glob("*")):  # Check if not empty
+            if _dir_nonempty(path):
                 logger.info(f"Found bundled browsers at: {path}")
-                return path
+                return path, True
                 
         logger.warning("No browsers found in executable bundle")
     
-    return Path()  # Return empty path if not found
+    return Path(), False  # Return empty path if not found
 
 def setup_persistent_browsers() -> bool:
     """
@@ -74,18 +121,19 @@ def setup_persistent_browsers() -> bool:
     logger.info(f"Persistent browser directory: {persistent_dir}")
     
     # Priority 1: Check for bundled browsers in executable
-    bundled_path = get_bundle_browser_path()
-    if bundled_path.exists() and any(bundled_path.glob("*")):
+    bundled_path, has_bundled = get_bundle_browser_path()
+    if has_bundled:
         # We have bundled browsers! Copy them to persistent storage if needed
-        if not any(persistent_dir.glob("*")) or not os.listdir(str(persistent_dir)):
+        if not _dir_nonempty(persistent_dir):
             logger.info(f"Copying bundled browsers to persistent storage: {persistent_dir}")
             try:
                 # Copy bundled browsers to persistent location
                 for item in bundled_path.glob("*"):
                     if item.is_dir():
-                        shutil.copytree(item, persistent_dir / item.name, dirs_exist_ok=True)
+                        shutil.copytree(item, persistent_dir / item.name, dirs_exist_ok=True,
+                                        copy_function=_link_or_copy)
                     else:
-                        shutil.copy2(item, persistent_dir / item.name)
+                        _link_or_copy(item, persistent_dir / item.name)
                 logger.info("Bundled browsers copied successfully")
             except Exception as e:
                 logger.error(f"Failed to copy bundled browsers: {e}")
@@ -96,7 +144,7 @@ def setup_persistent_browsers() -> bool:
         return True
     
     # Priority 2: Check for browsers in persistent storage
-    if persistent_dir.exists() and any(persistent_dir.glob("*")) and os.listdir(str(persistent_dir)):
+    if _dir_nonempty(persistent_dir):
         # We have browsers in persistent storage
         os.environ["PLAYWRIGHT_BROWSERS_PATH"] = str(persistent_dir)
         logger.info(f"Using existing persistent browsers at: {persistent_dir}")
@@ -107,8 +155,31 @@ def setup_persistent_browsers() -> bool:
     logger.info(f"No browsers available, will need installation to: {persistent_dir}")
     return False
 
+def _browser_dir_fingerprint():
+    """Identify the current state of the persistent browser directory"""
+    browsers_dir = get_app_data_dir()
+    try:
+        return (str(browsers_dir), browsers_dir.stat().st_mtime_ns)
+    except OSError:
+        return (str(browsers_dir), None)
+
 def check_browsers_available() -> bool:
-    """Check if browsers are properly setup and working"""
+    """Check if browsers are properly setup and working (memoized for a few minutes)"""
+    key = _browser_dir_fingerprint()
+    if (_availability_cache["ok"] is not None and _availability_cache["key"] == key
+            and time.monotonic() - _availability_cache["ts"] < _AVAILABILITY_TTL_SECONDS):
+        return _availability_cache["ok"]
+    
+    ok = _launch_test_browser()
+    _availability_cache.update(key=key, ok=ok, ts=time.monotonic())
+    return ok
+
+def clear_browser_availability_cache():
+    """Forget the memoized launch test (call when the browser install changes)"""
+    _availability_cache["ok"] = None
+
+def _launch_test_browser() -> bool:
+    """Launch and close headless Chromium to prove the browsers work"""
     try:
         # Try importing and testing Playwright
         from playwright.sync_api import sync_playwright
@@ -123,46 +194,36 @@ def check_browsers_available() -> bool:
         logger.warning(f"Browsers not available or not working: {e}")
         return False
 
+# (available, status message, report the bundle location) for each browser state,
+# checked in order: working, persistent copy present, bundle only, nothing
+_BROWSER_STATUSES = {
+    "working": (True, "Browsers ready to use", False),
+    "persistent": (False, "Browsers found but not working - may need reinstallation", False),
+    "bundled": (False, "Bundled browsers found but not copied - may need installation", True),
+    "missing": (False, "No browsers available - installation required", False),
+}
+
 def get_browser_status() -> dict:
     """Get status of persistent browsers"""
     persistent_dir = get_app_data_dir()
-    bundled_path = get_bundle_browser_path()
-    has_bundled = bundled_path.exists() and any(bundled_path.glob("*"))
-    has_persistent = persistent_dir.exists() and any(persistent_dir.glob("*"))
+    bundled_path, has_bundled = get_bundle_browser_path()
+    has_persistent = _dir_nonempty(persistent_dir)
     browsers_working = check_browsers_available()
     
     if browsers_working:
-        return {
-            "available": True,
-            "bundled_found": has_bundled,
-            "persistent_found": has_persistent,
-            "status": "Browsers ready to use",
-            "location": str(persistent_dir)
-        }
+        state = "working"
     elif has_persistent:
-        return {
-            "available": False,
-            "bundled_found": has_bundled,
-            "persistent_found": True,
-            "status": "Browsers found but not working - may need reinstallation",
-            "location": str(persistent_dir)
-        }
+        state = "persistent"
     elif has_bundled:
-        return {
-            "available": False,
-            "bundled_found": True,
-            "persistent_found": False,
-            "status": "Bundled browsers found but not copied - may need installation",
-            "location": str(bundled_path)
-        }
+        state = "bundled"
     else:
-        return {
-            "available": False,
-            "bundled_found": False,
-            "persistent_found": False,
-            "status": "No browsers available - installation required",
-            "location": str(persistent_dir)
-        }
-
-# Initialize on module import
-setup_persistent_browsers()
+        state = "missing"
+    available, status, at_bundle = _BROWSER_STATUSES[state]
+    
+    return {
+        "available": available,
+        "bundled_found": has_bundled,
+        "persistent_found": has_persistent,
+        "status": status,
+        "location": str(bundled_path if at_bundle else persistent_dir)
+    }
@@ -4,5 +4,5 @@ echo.
 echo The server will be available at: http://localhost:5000
 echo Press Ctrl+C to stop the server
 echo.
-GoogleMapsScraper.exe
+GoogleMapsScraper\GoogleMapsScraper.exe
 pause
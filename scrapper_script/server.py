@@ -3,40 +3,100 @@
 Production server for optimized scraper with n8n integration
 """
 
+import asyncio
+import json
 import time
 import logging
-import os
-from datetime import datetime
-from typing import Dict, Any
-from flask import Flask, request, jsonify
-from dotenv import load_dotenv
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Tuple
+from flask import Flask, Response, request
 
+try:
+    import orjson
+except ImportError:  # Optional: faster JSON encoding of responses
+    orjson = None
+
+from config import ServerConfig
 from utils.async_manager import AsyncEventLoopManager
 from utils.file_saver import FileSaver
+from utils.timestamps import iso_now
+from persistent_browser_manager import setup_persistent_browsers
 from scrapers.google_maps_scraper import OptimizedGoogleMapsScraper
 from database_manager import DatabaseManager
 from webhook_handler import WebhookHandler
 
-# Load environment variables
-load_dotenv()
-
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class ScrapeJob:
+    """Fields of a /scrape-single payload, read in one pass"""
+    job_id: Any
+    area_id: Any
+    search_term: str
+    area_name: str
+    admin_id: Optional[Any] = None
+    max_results: int = 50
+    
+    REQUIRED_FIELDS = ('job_id', 'area_id', 'search_term', 'area_name')
+    
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any], default_max_results: int) -> Tuple['ScrapeJob', list]:
+        """Build a job from the n8n payload and list the required fields it lacks"""
+        job = cls(
+            job_id=data.get('job_id'),
+            area_id=data.get('area_id'),
+            search_term=data.get('search_term', data.get('keyword', '')),
+            area_name=data.get('area_name', ''),
+            admin_id=data.get('admin_id'),
+            max_results=data.get('max_results', default_max_results),
+        )
+        missing = [name for name in cls.REQUIRED_FIELDS if not getattr(job, name)]
+        return job, missing
+
+
 class ProductionServer:
     """Production server for optimized scraper with n8n integration"""
     
-    def __init__(self):
+    # Browser storage is prepared once per process, before the first scraper is built
+    _browsers_initialized = False
+    
+    # Headers for Docker networking compatibility, shared by every JSON response
+    BASE_RESPONSE_HEADERS = (
+        ('Access-Control-Allow-Origin', '*'),
+        ('Access-Control-Allow-Methods', 'POST, GET, OPTIONS'),
+        ('Access-Control-Allow-Headers', 'Content-Type'),
+        ('Access-Control-Max-Age', '86400'),  # Let clients cache preflight results for a day
+        ('Content-Type', 'application/json')
+    )
+    
+    # Preflight replies never change, so their body is encoded once
+    PREFLIGHT_BODY = json.dumps({"status": "ok"})
+    
+    def __init__(self, config: Optional[ServerConfig] = None):
+        self.config = config or ServerConfig.from_env()
+        if not ProductionServer._browsers_initialized:
+            setup_persistent_browsers()
+            ProductionServer._browsers_initialized = True
+        
         self.app = Flask(__name__)
         self.scraper = None
+        # Connections are kept alive unless FORCE_CONN_CLOSE is set for a client that needs it
+        self.RESPONSE_HEADERS = self.BASE_RESPONSE_HEADERS + (
+            (('Connection', 'close'),) if self.config.force_conn_close else ()
+        )
+        # Jobs beyond this many wait their turn on the event loop
+        self.MAX_CONCURRENT_JOBS = self.config.max_concurrent_jobs
+        self.job_semaphore = None  # Created on the event loop by the first job
         self.event_loop_manager = AsyncEventLoopManager()
         self.db_manager = DatabaseManager()
-        self.webhook_handler = WebhookHandler()
+        self.webhook_handler = WebhookHandler(self.config)
         self._setup_routes()
         self._setup_error_handlers()
         
         # Configuration from environment
-        self.DEFAULT_MAX_RESULTS = int(os.getenv('DEFAULT_MAX_RESULTS', 50))
-        self.CACHE_TTL_MINUTES = int(os.getenv('CACHE_TTL_MINUTES', 0))
+        self.DEFAULT_MAX_RESULTS = self.config.default_max_results
+        self.CACHE_TTL_MINUTES = self.config.cache_ttl_minutes
         
         # Disable caching for job processing by default
         self.result_cache = {} if self.CACHE_TTL_MINUTES > 0 else None
@@ -44,17 +104,8 @@ class ProductionServer:
         
     def _make_docker_compatible_response(self, data, status_code=200):
         """Create Docker-compatible response with proper headers"""
-        response = jsonify(data)
-        response.status_code = status_code
-        
-        # Add headers for Docker networking compatibility
-        response.headers['Access-Control-Allow-Origin'] = '*'
-        response.headers['Access-Control-Allow-Methods'] = 'POST, GET, OPTIONS'
-        response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
-        response.headers['Connection'] = 'close'  # Force connection close
-        response.headers['Content-Type'] = 'application/json'
-        
-        return response
+        body = orjson.dumps(data) if orjson is not None else json.dumps(data)
+        return Response(body, status=status_code, headers=self.RESPONSE_HEADERS)
     
     def _setup_routes(self):
         """Setup Flask routes"""
@@ -64,7 +115,7 @@ class ProductionServer:
             return self._make_docker_compatible_response({
                 "status": "healthy",
                 "service": "Optimized Google Maps Scraper V6 - N8N Integrated",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": iso_now(),
                 "version": "6.1.0 - N8N Job Processing Integration",
                 "features": [
                     "N8N Workflow Integration",
@@ -78,7 +129,7 @@ class ProductionServer:
                 ],
                 "database_connected": self.db_manager is not None,
                 "webhook_configured": self.webhook_handler.completion_webhook_url is not None and self.webhook_handler.test_webhook_url is not None,
-                "admin_id": self.db_manager.admin_id if self.db_manager else None
+                "admin_id": str(self.db_manager.admin_id) if self.db_manager else None
             })
         
         @self.app.route('/scrape-single', methods=['POST', 'OPTIONS'])
@@ -94,49 +145,51 @@ class ProductionServer:
             return self._make_docker_compatible_response({
                 "webhook_test": "success" if success else "failed",
                 "webhook_url": self.webhook_handler.webhook_url,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             })
 
     def _handle_options_request(self):
         """Handle CORS preflight OPTIONS requests"""
-        response = self._make_docker_compatible_response({"status": "ok"})
-        return response
+        return Response(self.PREFLIGHT_BODY, headers=self.RESPONSE_HEADERS)
     
     def _handle_scrape_single(self):
         """Handle single scraping request from n8n workflow"""
         start_time = time.time()
         
         try:
-            data = request.get_json()
-            if not data:
+            data = request.get_json(silent=True)
+            if not data or not isinstance(data, dict):
                 return self._make_docker_compatible_response({
                     "success": False,
                     "error": "No data provided",
                     "businesses": []
                 }, 400)
             
-            # Extract job data from n8n payload
-            job_id = data.get('job_id')
-            area_id = data.get('area_id')
-            admin_id = data.get('admin_id')
-            search_term = data.get('search_term', data.get('keyword', ''))
-            area_name = data.get('area_name', '')
-            max_results = data.get('max_results', self.DEFAULT_MAX_RESULTS)
-            
-            # Validate required fields
-            if not all([job_id, area_id, search_term, area_name]):
+            # Extract and validate job data from n8n payload
+            job, missing = ScrapeJob.from_payload(data, self.DEFAULT_MAX_RESULTS)
+            if missing:
                 return self._make_docker_compatible_response({
                     "success": False,
-                    "error": "Missing required fields: job_id, area_id, search_term, area_name",
+                    "error": "Missing required fields: " + ", ".join(missing),
                     "businesses": []
                 }, 400)
+            job_id = job.job_id
+            admin_id = job.admin_id
             
-            logger.info(f"Processing n8n job {job_id}: '{search_term}' in '{area_name}'")
+            logger.info("Processing n8n job %s: '%s' in '%s'", job_id, job.search_term, job.area_name)
             
-            # Step 1: Mark admin as busy
-            success = self.db_manager.mark_admin_busy(job_id)
-            if not success:
-                logger.warning(f"Failed to mark admin as busy for job {job_id}, continuing anyway")
+            # Step 1: Claim the job and mark admin as busy
+            claim = self.db_manager.mark_admin_busy(job_id)
+            if claim == 'not_pending':
+                # Another worker owns the job, or it is already finished
+                return self._make_docker_compatible_response({
+                    "success": False,
+                    "job_id": job_id,
+                    "error": "Job is not pending (already claimed or finished)",
+                    "businesses": []
+                }, 409)
+            if claim != 'claimed':
+                logger.warning("Failed to mark admin as busy for job %s, continuing anyway", job_id)
             
             # Step 2: Send immediate response to n8n (prevents timeout)
             response_data = {
@@ -144,24 +197,18 @@ class ProductionServer:
                 "job_id": job_id,
                 "message": "Job processing started",
                 "admin_id": admin_id,
-                "timestamp": datetime.now().isoformat()
+                "timestamp": iso_now()
             }
             
-            # Step 3: Start background processing (asynchronous - no waiting)
-            import threading
-            processing_thread = threading.Thread(
-                target=self._process_job_in_background,
-                args=(data, start_time),
-                daemon=True
-            )
-            processing_thread.start()
+            # Step 3: Start background processing on the shared event loop (no waiting)
+            self.event_loop_manager.submit(self._process_job_guarded(job, start_time))
             
             # Return immediate response to N8N
             return self._make_docker_compatible_response(response_data)
             
         except Exception as e:
             error_message = str(e)
-            logger.error(f"Request handling failed: {error_message}")
+            logger.error("Request handling failed: %s", error_message)
             
             # Ensure admin is marked as active on any error
             try:
@@ -175,15 +222,25 @@ class ProductionServer:
                 "businesses": []
             }, 500)
     
-    def _process_job_in_background(self, data, start_time):
-        """Process job in background thread to avoid blocking HTTP response"""
-        job_id = data.get('job_id')
-        area_id = data.get('area_id')
+    async def _process_job_guarded(self, job: ScrapeJob, start_time):
+        """Run a job once one of the MAX_CONCURRENT_JOBS slots is free"""
+        if self.job_semaphore is None:
+            self.job_semaphore = asyncio.Semaphore(self.MAX_CONCURRENT_JOBS)
+        
+        async with self.job_semaphore:
+            await self._process_job_in_background(job, start_time)
+    
+    async def _process_job_in_background(self, job: ScrapeJob, start_time):
+        """Process job as a task on the event loop to avoid blocking HTTP response
+        
+        Blocking database calls run in worker threads via asyncio.to_thread.
+        """
+        job_id = job.job_id
+        area_id = job.area_id
         
         try:
-            # Run async processing in the background
-            scraper_result = self.event_loop_manager.run_async(
-                self._process_job_async(data),
+            scraper_result = await asyncio.wait_for(
+                self._process_job_async(job),
                 timeout=8000.0  # 10 minute timeout for scraping
             )
             
@@ -192,60 +249,58 @@ class ProductionServer:
             
             # Store results in database
             if scraper_result.get('success') and businesses_found > 0:
-                storage_success = self.db_manager.store_businesses(
+                storage_success = await asyncio.to_thread(
+                    self.db_manager.store_businesses,
                     job_id=job_id,
                     area_id=area_id, 
                     businesses=scraper_result.get('businesses', [])
                 )
                 
                 if storage_success:
-                    # Update job as completed
-                    self.db_manager.update_job_status(
+                    # Update job as completed and area last scraped (issued concurrently)
+                    await asyncio.to_thread(
+                        self.db_manager.complete_job,
                         job_id=job_id,
-                        status='completed',
+                        area_id=area_id,
                         businesses_found=businesses_found,
                         processing_time_seconds=processing_time,
-                        completed_at=datetime.now().isoformat(),
                         logs=scraper_result.get('extraction_method', 'two_phase')
                     )
                     
-                    # Update area last scraped
-                    self.db_manager.update_area_last_scraped(area_id)
-                    
-                    logger.info(f"Job {job_id} completed successfully: {businesses_found} businesses found")
+                    logger.info("Job %s completed successfully: %s businesses found", job_id, businesses_found)
                 else:
                     # Storage failed but scraping succeeded
                     error_msg = "Business data storage failed"
-                    self.db_manager.update_job_status(
+                    await asyncio.to_thread(
+                        self.db_manager.update_job_status,
                         job_id=job_id,
                         status='failed',
                         error_message=error_msg,
                         businesses_found=0,
-                        processing_time_seconds=processing_time,
-                        completed_at=datetime.now().isoformat()
+                        processing_time_seconds=processing_time
                     )
                     
-                    logger.error(f"Job {job_id} failed during storage: {error_msg}")
+                    logger.error("Job %s failed during storage: %s", job_id, error_msg)
                     scraper_result['success'] = False
                     scraper_result['error'] = error_msg
                     
             else:
                 # Update job as failed
                 error_msg = scraper_result.get('error', 'No businesses found')
-                self.db_manager.update_job_status(
+                await asyncio.to_thread(
+                    self.db_manager.update_job_status,
                     job_id=job_id,
                     status='failed',
                     error_message=error_msg,
                     businesses_found=0,
-                    processing_time_seconds=processing_time,
-                    completed_at=datetime.now().isoformat()
+                    processing_time_seconds=processing_time
                 )
                 
-                logger.warning(f"Job {job_id} failed: {error_msg}")
+                logger.warning("Job %s failed: %s", job_id, error_msg)
             
             # Send webhook notification to n8n
-            self.webhook_handler.notify_job_completion(
-                job_data=data,
+            await self.webhook_handler.notify_job_completion(
+                job_data=asdict(job),
                 success=scraper_result.get('success', False),
                 businesses_found=businesses_found,
                 processing_time=processing_time,
@@ -256,21 +311,21 @@ class ProductionServer:
             processing_time = time.time() - start_time
             error_message = str(processing_error)
             
-            logger.error(f"Job {job_id} processing failed: {error_message}")
+            logger.error("Job %s processing failed: %s", job_id, error_message)
             
             # Update job as failed
-            self.db_manager.update_job_status(
+            await asyncio.to_thread(
+                self.db_manager.update_job_status,
                 job_id=job_id,
                 status='failed',
                 error_message=error_message,
                 businesses_found=0,
-                processing_time_seconds=processing_time,
-                completed_at=datetime.now().isoformat()
+                processing_time_seconds=processing_time
             )
             
             # Send failure webhook
-            self.webhook_handler.notify_job_completion(
-                job_data=data,
+            await self.webhook_handler.notify_job_completion(
+                job_data=asdict(job),
                 success=False,
                 businesses_found=0,
                 processing_time=processing_time,
@@ -279,9 +334,9 @@ class ProductionServer:
         
         finally:
             # Always mark admin as active again
-            self.db_manager.mark_admin_active()
+            await asyncio.to_thread(self.db_manager.mark_admin_active)
     
-    async def _process_job_async(self, job_data):
+    async def _process_job_async(self, job: ScrapeJob):
         """Process job asynchronously with fresh browser approach"""
         # Create a new scraper for each request to ensure completely fresh state
         scraper = OptimizedGoogleMapsScraper()
@@ -289,32 +344,32 @@ class ProductionServer:
         try:
             # Prepare scraper request data
             scraper_request = {
-                'search_term': job_data.get('search_term', job_data.get('keyword')),
-                'area_name': job_data.get('area_name'),
-                'max_results': job_data.get('max_results', self.DEFAULT_MAX_RESULTS)
+                'search_term': job.search_term,
+                'area_name': job.area_name,
+                'max_results': job.max_results
             }
             
             result = await scraper.scrape_single_search(scraper_request)
             
             # Enhance result with job information
-            result['job_id'] = job_data.get('job_id')
-            result['area_id'] = job_data.get('area_id')
-            result['admin_id'] = job_data.get('admin_id')
+            result['job_id'] = job.job_id
+            result['area_id'] = job.area_id
+            result['admin_id'] = job.admin_id
             
             return result
             
         except Exception as e:
-            logger.error(f"Scraper error for job {job_data.get('job_id')}: {str(e)}")
+            logger.error("Scraper error for job %s: %s", job.job_id, e)
             return {
                 "success": False,
                 "error": f"Scraper error: {str(e)}",
-                "search_term": job_data.get('search_term', job_data.get('keyword', '')),
-                "area_name": job_data.get('area_name', ''),
+                "search_term": job.search_term,
+                "area_name": job.area_name,
                 "businesses": [],
-                "job_id": job_data.get('job_id'),
-                "area_id": job_data.get('area_id'),
-                "admin_id": job_data.get('admin_id'),
-                "timestamp": datetime.now().isoformat()
+                "job_id": job.job_id,
+                "area_id": job.area_id,
+                "admin_id": job.admin_id,
+                "timestamp": iso_now()
             }
     
     def _setup_error_handlers(self):
@@ -330,9 +385,9 @@ class ProductionServer:
     
     def run(self, host='0.0.0.0', port=5000):
         """Run the server"""
-        # Get host and port from environment if available
-        host = os.getenv('SERVER_HOST', host)
-        port = int(os.getenv('SERVER_PORT', port))
+        # Host and port from the environment take precedence when set
+        host = self.config.server_host or host
+        port = self.config.server_port or port
         
         logger.info("🚀 Starting Optimized Google Maps Scraper V6 - N8N Integrated...")
         logger.info("🎯 Features: N8N workflow integration + Smart auto-scroll + Two-phase extraction")
@@ -343,7 +398,7 @@ class ProductionServer:
         # Log caching configuration
         if self.result_cache is not None:
             cache_minutes = self.CACHE_DURATION // 60
-            logger.info(f"💾 Result caching ENABLED - Results cached for {cache_minutes} minutes")
+            logger.info("💾 Result caching ENABLED - Results cached for %s minutes", cache_minutes)
         else:
             logger.info("💾 Result caching DISABLED - Job processing mode")
         
@@ -359,7 +414,7 @@ class ProductionServer:
             self.db_manager.mark_admin_active()
             logger.info("✅ Database connection successful")
         except Exception as e:
-            logger.error(f"❌ Database connection failed: {e}")
+            logger.error("❌ Database connection failed: %s", e)
         
         try:
             logger.info("🔍 Testing webhook connection...")
@@ -369,11 +424,29 @@ class ProductionServer:
             else:
                 logger.warning("⚠️  Webhook connection test failed")
         except Exception as e:
-            logger.error(f"❌ Webhook test failed: {e}")
+            logger.error("❌ Webhook test failed: %s", e)
         
-        logger.info(f"🌐 Server starting on {host}:{port}")
-        # Configure server timeout via WSGI server to prevent connection drops during long scraping operations
+        logger.info("🌐 Server starting on %s:%s", host, port)
         from werkzeug.serving import WSGIRequestHandler
-        WSGIRequestHandler.timeout = 900  # 15 minutes to exceed scraping timeout of 600 seconds
+        # HTTP/1.1 lets clients such as n8n reuse the connection between requests.
+        # Jobs run in the background, so requests are short; the socket timeout
+        # only bounds how long an idle keep-alive connection holds a server thread
+        WSGIRequestHandler.protocol_version = "HTTP/1.1"
+        WSGIRequestHandler.timeout = 60
         
-        self.app.run(host=host, port=port, debug=False, threaded=True) 
\ No newline at end of file
+        try:
+            self.app.run(host=host, port=port, debug=False, threaded=True)
+        finally:
+            self.shutdown()
+    
+    def shutdown(self):
+        """Flush queued webhook completions and close the webhook clients"""
+        loop = self.event_loop_manager.loop
+        try:
+            if loop is not None and loop.is_running():
+                # Queued completions and the async client belong to the job event loop
+                self.event_loop_manager.run_async(self.webhook_handler.aclose(), timeout=30.0)
+            else:
+                self.webhook_handler.close()
+        except Exception as e:
+            logger.warning("Failed to flush webhooks on shutdown: %s", e) 
\ No newline at end of file
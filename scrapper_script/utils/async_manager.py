@@ -52,4 +52,9 @@ class AsyncEventLoopManager:
         """Run async function safely"""
         loop = self.get_loop()
         future = asyncio.run_coroutine_threadsafe(coro, loop)
-        return future.result(timeout=timeout) 
\ No newline at end of file
+        return future.result(timeout=timeout)
+    
+    def submit(self, coro):
+        """Schedule a coroutine on the loop without waiting for its result"""
+        loop = self.get_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop)
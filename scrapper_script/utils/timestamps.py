@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+"""
+Cached ISO timestamps for response and webhook payloads
+"""
+
+import time
+from datetime import datetime
+
+# (epoch second, ISO string) of the last timestamp handed out
+_last_timestamp = (0, "")
+
+def iso_now() -> str:
+    """Current local time as an ISO string with second precision, formatted once per second"""
+    global _last_timestamp
+    second = int(time.time())
+    cached_second, cached_text = _last_timestamp
+    if second != cached_second:
+        cached_text = datetime.fromtimestamp(second).isoformat()
+        _last_timestamp = (second, cached_text)
+    return cached_text
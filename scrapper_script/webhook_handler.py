@@ -3,36 +3,70 @@
 Webhook handler for n8n integration
 """
 
-import os
+import asyncio
 import logging
-import requests
-from typing import Dict, Any
-from datetime import datetime
-from dotenv import load_dotenv
+import socket
+import httpx
+from typing import Dict, Any, Optional
 
-# Load environment variables
-load_dotenv()
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx (httpx[http2])
+except ImportError:  # Optional: fall back to HTTP/1.1 keep-alive
+    h2 = None
+
+from config import ServerConfig
+from utils.timestamps import iso_now
 
 logger = logging.getLogger(__name__)
 
 class WebhookHandler:
     """Handles webhook notifications to n8n workflow"""
     
-    def __init__(self):
-        self.completion_webhook_url = os.getenv('N8N_WEBHOOK_C')
-        self.test_webhook_url = os.getenv('N8N_WEBHOOK_T')
+    # With N8N_WEBHOOK_BATCHING enabled, completions arriving within this window
+    # are sent together as {"completions": [...]}, at most BATCH_MAX_ITEMS per POST
+    BATCH_WINDOW_SECONDS = 0.25
+    BATCH_MAX_ITEMS = 10
+    
+    def __init__(self, config: Optional[ServerConfig] = None):
+        config = config or ServerConfig.from_env()
+        self.completion_webhook_url = config.n8n_webhook_c
+        self.test_webhook_url = config.n8n_webhook_t
         
         if not self.completion_webhook_url:
             logger.warning("N8N_WEBHOOK_C not set - job completion notifications disabled")
         else:
-            logger.info(f"Job completion webhook initialized: {self.completion_webhook_url}")
+            logger.info("Job completion webhook initialized: %s", self.completion_webhook_url)
             
         if not self.test_webhook_url:
             logger.warning("N8N_WEBHOOK_T not set - test webhook disabled")
         else:
-            logger.info(f"Test webhook initialized: {self.test_webhook_url}")
+            logger.info("Test webhook initialized: %s", self.test_webhook_url)
+        
+        # Pooled clients keep connections to n8n alive between calls. The async
+        # client serves completion notifications from the server's event loop;
+        # the connection test is called synchronously (startup, GUI).
+        # HTTP/2 multiplexes concurrent completions over one connection to n8n;
+        # TCP_NODELAY sends each small JSON POST without waiting on Nagle's algorithm
+        self.client = httpx.AsyncClient(
+            headers={'Content-Type': 'application/json'},
+            timeout=httpx.Timeout(60.0),
+            transport=httpx.AsyncHTTPTransport(
+                http2=h2 is not None,
+                limits=httpx.Limits(max_keepalive_connections=10),
+                socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)]
+            )
+        )
+        self.test_client = httpx.Client(
+            headers={'Content-Type': 'application/json'},
+            timeout=httpx.Timeout(20.0)
+        )
+        
+        # Batched completions (the n8n workflow must accept a "completions" array)
+        self.batching = config.webhook_batching
+        self.pending_completions = []
+        self.flush_task = None
     
-    def notify_job_completion(self, job_data: Dict[str, Any], success: bool, 
+    async def notify_job_completion(self, job_data: Dict[str, Any], success: bool, 
                             businesses_found: int = 0, processing_time: float = 0,
                             error_message: str = None) -> bool:
         """Send job completion notification to n8n webhook"""
@@ -51,32 +85,71 @@ class WebhookHandler:
                 'success': success,
                 'businesses_found': businesses_found,
                 'processing_time': round(processing_time, 2),
-                'completed_at': datetime.now().isoformat(),
+                'completed_at': iso_now(),
                 'error_message': error_message if not success else None
             }
             
-            logger.info(f"Sending webhook notification for job {job_data.get('job_id')}")
-            logger.debug(f"Webhook payload: {payload}")
+            if self.batching:
+                self.pending_completions.append(payload)
+                if self.flush_task is None:
+                    self.flush_task = asyncio.create_task(self._flush_completions())
+                logger.info("Queued webhook notification for job %s", job_data.get('job_id'))
+                return True
             
-            response = requests.post(
-                self.completion_webhook_url,
-                json=payload,
-                timeout=60,
-                headers={'Content-Type': 'application/json'}
-            )
+            logger.info("Sending webhook notification for job %s", job_data.get('job_id'))
+            logger.debug("Webhook payload: %s", payload)
+            return await self._post_completion(payload, f"job {job_data.get('job_id')}")
+            
+        except Exception as e:
+            logger.error("Unexpected error sending webhook for job %s: %s", job_data.get('job_id'), e)
+            return False
+    
+    async def _flush_completions(self):
+        """Send queued completions in batches once the batching window has passed"""
+        try:
+            await asyncio.sleep(self.BATCH_WINDOW_SECONDS)
+            await self._send_pending_completions()
+        finally:
+            self.flush_task = None
+    
+    async def _send_pending_completions(self):
+        """POST every queued completion, BATCH_MAX_ITEMS per request"""
+        while self.pending_completions:
+            batch = self.pending_completions[:self.BATCH_MAX_ITEMS]
+            del self.pending_completions[:self.BATCH_MAX_ITEMS]
+            job_ids = ', '.join(str(item['job_id']) for item in batch)
+            await self._post_completion({'completions': batch}, f"jobs {job_ids}")
+    
+    async def aclose(self):
+        """Send any queued completions, then close the HTTP clients (call on shutdown)"""
+        if self.flush_task is not None:
+            # Let the scheduled flush finish rather than cancel it mid-POST
+            await self.flush_task
+        await self._send_pending_completions()
+        await self.client.aclose()
+        self.test_client.close()
+    
+    def close(self):
+        """Blocking aclose() for handlers not tied to a running event loop (e.g. the GUI's)"""
+        asyncio.run(self.aclose())
+    
+    async def _post_completion(self, body: Dict[str, Any], label: str) -> bool:
+        """POST a completion body to the n8n webhook"""
+        try:
+            response = await self.client.post(self.completion_webhook_url, json=body)
             
             response.raise_for_status()
-            logger.info(f"Webhook notification sent successfully for job {job_data.get('job_id')}")
+            logger.info("Webhook notification sent successfully for %s", label)
             return True
             
-        except requests.exceptions.Timeout:
-            logger.error(f"Webhook notification timeout for job {job_data.get('job_id')}")
+        except httpx.TimeoutException:
+            logger.error("Webhook notification timeout for %s", label)
             return False
-        except requests.exceptions.RequestException as e:
-            logger.error(f"Webhook notification failed for job {job_data.get('job_id')}: {e}")
+        except httpx.HTTPError as e:
+            logger.error("Webhook notification failed for %s: %s", label, e)
             return False
         except Exception as e:
-            logger.error(f"Unexpected error sending webhook for job {job_data.get('job_id')}: {e}")
+            logger.error("Unexpected error sending webhook for %s: %s", label, e)
             return False
     
     def test_webhook_connection(self) -> bool:
@@ -91,20 +164,15 @@ class WebhookHandler:
                 'message': 'Test successful'
             }
             
-            response = requests.post(
-                self.test_webhook_url,
-                json=test_payload,
-                timeout=20,
-                headers={'Content-Type': 'application/json'}
-            )
+            response = self.test_client.post(self.test_webhook_url, json=test_payload)
             
             if response.status_code == 200:
                 logger.info("Webhook connection test successful")
                 return True
             else:
-                logger.error(f"Webhook test failed with status {response.status_code}")
+                logger.error("Webhook test failed with status %s", response.status_code)
                 return False
                 
         except Exception as e:
-            logger.error(f"Webhook connection test failed: {e}")
+            logger.error("Webhook connection test failed: %s", e)
             return False